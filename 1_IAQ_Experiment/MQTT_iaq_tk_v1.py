@@ -26,13 +26,24 @@ Payload expected (from ESP32 sketch):
 import threading
 import queue
 import time
+import math
 import os
+import io
+import socket
 import csv
+import bisect
+import functools
+from collections import deque
 from datetime import datetime
-import json
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 
+# JSON decoding: orjson if available (parses the raw payload bytes directly)
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
 # MQTT
 try:
     import paho.mqtt.client as mqtt
@@ -41,15 +52,24 @@ except Exception:
 
 # Matplotlib (optional)
 try:
+    import numpy as np
     import matplotlib
     matplotlib.use("TkAgg")
     from matplotlib.figure import Figure
     from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 except Exception:
+    np = None
     matplotlib = None
     Figure = None
     FigureCanvasTkAgg = None
 
+# Numba (optional): JIT the axis-scale arithmetic, plain Python otherwise
+try:
+    from numba import njit
+except Exception:
+    def njit(*args, **kwargs):
+        return lambda f: f
+
 
 # ---------- Helpers ----------
 def parse_flexible(s):
@@ -58,25 +78,45 @@ def parse_flexible(s):
         return 0.0
     if isinstance(s, (int, float)):
         return float(s)
-    s = str(s).strip()
-    if not s:
-        return 0.0
+    # float() already ignores surrounding whitespace and rejects "",
+    # so one attempt (after swapping a decimal comma) is enough
+    s = str(s)
+    if "," in s:
+        s = s.replace(",", ".")
     try:
         return float(s)
-    except:
-        pass
-    try:
-        return float(s.replace(",", "."))
-    except:
+    except ValueError:
         return 0.0
 
 
+# Fixed-schema IAQ log row (same order as IAQApp.headers)
+CSV_ROW_FMT = "%s,%d,%.2f,%.2f,%.2f,%.2f,%.2f,%.2f,%d,%.2f,%s,%s,%s,%s,%s,%s\n"
+
+
+def _csv_field(v: str) -> str:
+    if "," in v or '"' in v or "\n" in v:
+        return '"' + v.replace('"', '""') + '"'
+    return v
+
+
+def format_csv_row(row):
+    """Serialise one log row; iaq_status/co2_status come from the payload and may need quoting."""
+    return CSV_ROW_FMT % (*row[:10], _csv_field(row[10]), _csv_field(row[11]), *row[12:])
+
+
+def _num(v):
+    """parse_flexible with a fast path for values JSON already decoded as float."""
+    if isinstance(v, float):
+        return v
+    return parse_flexible(v)
+
+
+@njit(cache=True)
 def nice_num(x: float, round_: bool) -> float:
-    import math
     if x <= 0:
         return 1.0
     exp = math.floor(math.log10(x))
-    f = x / (10 ** exp)
+    f = x / (10.0 ** exp)
     if round_:
         if f < 1.5: nf = 1
         elif f < 3: nf = 2
@@ -87,11 +127,11 @@ def nice_num(x: float, round_: bool) -> float:
         elif f <= 2: nf = 2
         elif f <= 5: nf = 5
         else: nf = 10
-    return nf * (10 ** exp)
+    return nf * (10.0 ** exp)
 
 
+@njit(cache=True)
 def nice_scale(minv: float, maxv: float, max_ticks: int = 5):
-    import math
     if maxv <= minv:
         maxv = minv + 1
     rng = nice_num(maxv - minv, False)
@@ -99,12 +139,65 @@ def nice_scale(minv: float, maxv: float, max_ticks: int = 5):
     nice_min = math.floor(minv / tick) * tick
     nice_max = math.ceil(maxv / tick) * tick
     if nice_min > 400 and (nice_min - 400) < tick:
-        nice_min = 400
+        nice_min = 400.0
     return nice_min, nice_max, tick
 
 
+@functools.lru_cache(maxsize=64)
+def _nice_scale_q(minv_q: float, maxv_q: float, max_ticks: int):
+    return nice_scale(minv_q, maxv_q, max_ticks)
+
+
+def nice_scale_cached(minv: float, maxv: float, max_ticks: int = 5):
+    """nice_scale memoised on inputs rounded to 10 ppm (the CO₂ window drifts slowly)."""
+    return _nice_scale_q(round(minv / 10) * 10.0, round(maxv / 10) * 10.0, max_ticks)
+
+
+def blit_or_draw(canvas, ax, line, bg, full):
+    """Repaint only `line` over the cached background unless the axes changed."""
+    if full or bg is None:
+        canvas.draw_idle()  # draw_event handler re-caches the background
+        return
+    canvas.restore_region(bg)
+    ax.draw_artist(line)
+    canvas.blit(ax.bbox)
+
+
+class CO2History:
+    """Fixed-size float32 ring buffer holding the most recent CO₂ samples."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = np.empty(capacity, dtype=np.float32)
+        self._x = np.arange(capacity)
+        self._i = 0  # total samples written
+
+    def __len__(self):
+        return min(self._i, self.capacity)
+
+    def append(self, v: float):
+        self._buf[self._i % self.capacity] = v
+        self._i += 1
+
+    def xdata(self):
+        return self._x[:len(self)]
+
+    def values(self):
+        """Samples oldest-first; a view until the buffer has wrapped."""
+        if self._i <= self.capacity:
+            return self._buf[:self._i]
+        k = self._i % self.capacity
+        return np.concatenate((self._buf[k:], self._buf[:k]))
+
+
 # ---------- Dashboard popup ----------
 class DashboardWindow(tk.Toplevel):
+    # Status buckets for bisect: thresholds ascending, one (text, colour) per bucket
+    IAQ_THRESHOLDS = (40000.0, 80000.0)
+    IAQ_STATUS = (("Poor", "#A00000"), ("Moderate", "#A0A000"), ("Good", "#00A000"))
+    CO2_THRESHOLDS = (800.0, 1200.0)
+    CO2_STATUS = (("Normal", "#00A000"), ("Elevated", "#A0A000"), ("High", "#A00000"))
+
     def __init__(self, master):
         super().__init__(master)
         self.title("IAQ Dashboard")
@@ -187,8 +280,11 @@ class DashboardWindow(tk.Toplevel):
         self.fig = None
         self.ax = None
         self.canvas = None
-        self._co2_hist = []
-        if matplotlib:
+        self._co2_hist = CO2History(300) if matplotlib else None
+
+    def _ensure_figure(self):
+        # The mini-chart is built on the first redraw, not when the window opens
+        if self.fig is None:
             self.fig = Figure(figsize=(2.6, 0.9), dpi=100)
             self.ax = self.fig.add_subplot(111)
             self.ax.set_facecolor("#111111")
@@ -199,65 +295,84 @@ class DashboardWindow(tk.Toplevel):
             for spine in self.ax.spines.values():
                 spine.set_color('#AAAAAA')
             self.ax.set_ylabel("ppm", color='lightgray', fontsize=9)
+            self._title = self.ax.set_title("", color='lightgray', fontsize=9)
+            self._line, = self.ax.plot([], [], lw=2, color='deepskyblue', animated=True)
             fr = tk.Frame(self, bg="black")
             fr.pack(fill="x", padx=8, pady=(8,8))
             self.canvas = FigureCanvasTkAgg(self.fig, master=fr)
             self.canvas.get_tk_widget().pack(fill="x")
+            self._bg = None
+            self.canvas.mpl_connect("draw_event", self._on_canvas_draw)
+
+    @staticmethod
+    def _set_label(lbl, text, fg=None):
+        # Label.config is a Tk round-trip; skip it when nothing changed
+        if getattr(lbl, "_last_text", None) == (text, fg):
+            return
+        lbl._last_text = (text, fg)
+        if fg is None:
+            lbl.config(text=text)
+        else:
+            lbl.config(text=text, fg=fg)
 
     def update_dashboard(self, co2ppm, t_bme, rh_bme, p_hpa, gas_ohm):
         # Numbers
-        self.co2_val.config(text=f"{int(round(co2ppm))}")
-        self.t_val.config(text=f"{t_bme:.1f}")
-        self.rh_val.config(text=f"{rh_bme:.1f}")
-        self.p_val.config(text=f"{p_hpa:.1f}")
+        self._set_label(self.co2_val, f"{int(round(co2ppm))}")
+        self._set_label(self.t_val, f"{t_bme:.1f}")
+        self._set_label(self.rh_val, f"{rh_bme:.1f}")
+        self._set_label(self.p_val, f"{p_hpa:.1f}")
         gas_text = f"{gas_ohm/1000.0:.1f}" if gas_ohm >= 1000.0 else f"{int(round(gas_ohm))}"
-        self.gas_val.config(text=gas_text)
+        self._set_label(self.gas_val, gas_text)
 
         # Status colors
-        if gas_ohm >= 80000.0:
-            self.iaq_word.config(text="Good", fg="#00A000")
-        elif gas_ohm >= 40000.0:
-            self.iaq_word.config(text="Moderate", fg="#A0A000")
-        else:
-            self.iaq_word.config(text="Poor", fg="#A00000")
+        text, fg = self.IAQ_STATUS[bisect.bisect_right(self.IAQ_THRESHOLDS, gas_ohm)]
+        self._set_label(self.iaq_word, text, fg)
+        text, fg = self.CO2_STATUS[bisect.bisect_right(self.CO2_THRESHOLDS, co2ppm)]
+        self._set_label(self.co2_word, text, fg)
 
-        if co2ppm < 800.0:
-            self.co2_word.config(text="Normal", fg="#00A000")
-        elif co2ppm < 1200.0:
-            self.co2_word.config(text="Elevated", fg="#A0A000")
-        else:
-            self.co2_word.config(text="High", fg="#A00000")
+    def append_co2(self, co2):
+        if self._co2_hist is not None and co2 > 0:
+            self._co2_hist.append(co2)
 
     def append_co2_and_redraw(self, co2):
         if not matplotlib:
             return
-        if co2 > 0:
-            self._co2_hist.append(co2)
-            if len(self._co2_hist) > 300:
-                self._co2_hist.pop(0)
-
-        self.ax.cla()
-        self.ax.set_facecolor("#111111")
-        self.ax.grid(True, alpha=0.15)
-        self.ax.tick_params(axis='x', labelsize=8, colors='white')
-        self.ax.tick_params(axis='y', labelsize=8, colors='white')
-        for spine in self.ax.spines.values():
-            spine.set_color('#AAAAAA')
-        self.ax.set_ylabel("ppm", color='lightgray', fontsize=9)
-
-        if len(self._co2_hist) < 2:
-            self.ax.set_title("Waiting for CO₂…", color='lightgray', fontsize=9)
+        self.append_co2(co2)
+        self.redraw()
+
+    def _on_canvas_draw(self, event):
+        # After a full draw: cache the static background, then paint the animated line
+        self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self._line)
+
+    def redraw(self):
+        # Axis styling is static (set up in __init__); only data, limits and title change
+        if not matplotlib:
+            return
+        self._ensure_figure()
+        n = len(self._co2_hist)
+        if n < 2:
+            self._line.set_data([], [])
+            self._title.set_text("Waiting for CO₂…")
             self.canvas.draw_idle()
             return
+        full = self._title.get_text() != ""
+        self._title.set_text("")
 
-        vmin = min(self._co2_hist)
-        vmax = max(self._co2_hist)
+        ys = self._co2_hist.values()
+        vmin = float(ys.min())
+        vmax = float(ys.max())
         pad = max(30.0, 0.08*(vmax - vmin + 1))
-        ymin, ymax, _ = nice_scale(max(350.0, vmin - pad), vmax + pad, 3)
+        ymin, ymax, _ = nice_scale_cached(max(350.0, vmin - pad), vmax + pad, 3)
 
-        self.ax.set_ylim([ymin, ymax])
-        self.ax.plot(self._co2_hist, lw=2, color='deepskyblue')
-        self.canvas.draw_idle()
+        self._line.set_data(self._co2_hist.xdata(), ys)
+        if (0, n - 1) != self.ax.get_xlim():
+            self.ax.set_xlim(0, n - 1)
+            full = True
+        if (ymin, ymax) != self.ax.get_ylim():
+            self.ax.set_ylim(ymin, ymax)
+            full = True
+        blit_or_draw(self.canvas, self.ax, self._line, self._bg, full)
 
 
 # ---------- Main app (MQTT) ----------
@@ -268,7 +383,8 @@ class IAQApp(tk.Tk):
         self.geometry("1000x820+80+40")
 
         # State
-        self.q = queue.Queue()
+        # paho thread -> Tk hand-off; deque append/popleft are atomic
+        self.q = deque()
         self.mqtt_client = None
         self.mqtt_connected = False
 
@@ -281,11 +397,25 @@ class IAQApp(tk.Tk):
         self.log_folder = os.path.join(os.path.expanduser("~"), "Documents")
         self.log_path = None
         self.log_file = None
-        self.csv_writer = None
         self.rows_logged = 0
+        self._last_status_sec = -1  # csv_status_lbl is refreshed at most once per second
+        # Rows are handed to a background writer thread so disk I/O never
+        # blocks Tk; only that thread touches log_file after the header
+        self._csv_q = queue.SimpleQueue()
+        self._csv_thread = threading.Thread(target=self._csv_writer_loop, daemon=True)
+        self._csv_thread.start()
 
-        self.co2_hist = []
         self.MAX_POINTS = 600
+        self.co2_hist = CO2History(self.MAX_POINTS) if matplotlib else None
+
+        # CSV Live Monitor keeps only the newest rows (iids oldest-first)
+        self.TABLE_MAX_ROWS = 200
+        self._tv_children = deque()
+
+        # Console scrollback cap; scrolled to the end once per poll tick
+        self.CONSOLE_MAX_LINES = 500
+        self._console_dirty = False
+        self._console_at_bottom = True
 
         # Latest metrics (for dashboard)
         self.co2ppm = 0.0
@@ -296,9 +426,16 @@ class IAQApp(tk.Tk):
 
         self.dashboard = None
 
+        # Redraw throttle: telemetry only marks the plots dirty, and
+        # _render_tick redraws them at most 10 times per second
+        self._plot_dirty = False
+        self._render_period_ms = 100
+
         self._build_ui()
         self._init_live_table(self.headers)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
         self.after(100, self._poll_queue)
+        self.after(self._render_period_ms, self._render_tick)
 
     # ----- UI -----
     def _build_ui(self):
@@ -373,11 +510,14 @@ class IAQApp(tk.Tk):
             self.ax.set_facecolor("#0F0F0F")
             self.fig.patch.set_facecolor("#FFFFFF")
             self.ax.grid(True, alpha=0.2)
-            self.line, = self.ax.plot([], [], lw=2, color='deepskyblue')
+            self.line, = self.ax.plot([], [], lw=2, color='deepskyblue', animated=True)
+            self._title = self.ax.set_title("")
             self.ax.set_ylabel("ppm")
             self.ax.set_xlabel("samples")
             self.canvas = FigureCanvasTkAgg(self.fig, master=graph_gb)
             self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=6, pady=6)
+            self._bg = None
+            self.canvas.mpl_connect("draw_event", self._on_canvas_draw)
         else:
             ttk.Label(graph_gb, text="Matplotlib not available. Install with: pip install matplotlib").pack(padx=8, pady=8)
 
@@ -401,13 +541,27 @@ class IAQApp(tk.Tk):
 
     def _update_condition(self):
         room = self.room_var.get()
-        occ_tag = self.occ_var.get().replace(" ", "")
-        win_tag = self.win_var.get().replace(" ", "")
-        self.cond_label.config(text=f"{room}_{occ_tag}_{win_tag}")
+        occ_disp = self.occ_var.get()
+        win_disp = self.win_var.get()
+        cond = f"{room}_{occ_disp.replace(' ', '')}_{win_disp.replace(' ', '')}"
+        # Cached (room, occupancy, window, condition_label) for the telemetry path
+        self._cond_cached = (room, occ_disp, win_disp, cond)
+        self.cond_label.config(text=cond)
 
     def _append_console(self, text):
+        if not self._console_dirty:
+            # Follow the end only if the user hasn't scrolled up
+            self._console_dirty = True
+            self._console_at_bottom = self.console.yview()[1] > 0.98
         self.console.insert("end", text)
-        self.console.see("end")
+
+    def _flush_console(self):
+        self._console_dirty = False
+        n = int(self.console.index("end-1c").split(".")[0])
+        if n > self.CONSOLE_MAX_LINES:
+            self.console.delete("1.0", f"{n - self.CONSOLE_MAX_LINES}.0")
+        if self._console_at_bottom:
+            self.console.see("end")
 
     def _choose_folder(self):
         d = filedialog.askdirectory(initialdir=self.log_folder, title="Choose folder to save CSV logs")
@@ -417,15 +571,16 @@ class IAQApp(tk.Tk):
 
     # ----- CSV & table -----
     def _open_new_log_if_needed(self):
-        if self.csv_writer is not None:
+        if self.log_file is not None:
             return
         try:
             os.makedirs(self.log_folder, exist_ok=True)
             ts = datetime.now().strftime("%Y%m%d_%H%M%S")
             self.log_path = os.path.join(self.log_folder, f"iaq_log_{ts}.csv")
-            self.log_file = open(self.log_path, "w", newline="", encoding="utf-8")
-            self.csv_writer = csv.writer(self.log_file)
-            self.csv_writer.writerow(self.headers)
+            self.log_file = open(self.log_path, "wb", buffering=1 << 16)
+            header = io.StringIO()
+            csv.writer(header, lineterminator="\n").writerow(self.headers)
+            self.log_file.write(header.getvalue().encode("utf-8"))
             self.log_file.flush()
             self.rows_logged = 0
             self.log_file_lbl.config(text=f"Log file: {self.log_path}")
@@ -434,8 +589,53 @@ class IAQApp(tk.Tk):
         except Exception as e:
             self._append_console(f"[ERROR] Cannot open log file: {e}\n")
 
+    def _csv_writer_loop(self):
+        # Drain _csv_q in chunks of up to 256 rows / 100 ms; flush at most once a second
+        last_flush = time.monotonic()
+        pending = 0
+        stop = False
+        while not stop:
+            chunk = []
+            deadline = time.monotonic() + 0.1
+            while len(chunk) < 256:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    row = self._csv_q.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if row is None:  # sentinel from _close_log
+                    stop = True
+                    break
+                chunk.append(row)
+            try:
+                if chunk:
+                    self.log_file.write("".join(map(format_csv_row, chunk)).encode("utf-8"))
+                    pending += len(chunk)
+                now = time.monotonic()
+                if pending and (stop or now - last_flush >= 1.0):
+                    self.log_file.flush()
+                    pending = 0
+                    last_flush = now
+            except Exception as e:
+                self.q.append(("console", f"[ERROR] Failed to write CSV: {e}\n"))
+
+    def _close_log(self):
+        # Let the writer thread finish the queued rows before closing the file
+        self._csv_q.put(None)
+        self._csv_thread.join(timeout=2.0)
+        if self.log_file is None:
+            return
+        try:
+            self.log_file.close()
+        except Exception:
+            pass
+        self.log_file = None
+
     def _init_live_table(self, headers):
         self.table.delete(*self.table.get_children())
+        self._tv_children.clear()
         self.table["columns"] = headers
         for h in headers:
             self.table.heading(h, text=h)
@@ -443,31 +643,56 @@ class IAQApp(tk.Tk):
 
     # ----- Graph -----
     def _append_co2(self, val):
-        if val <= 0:
+        if self.co2_hist is None or val <= 0:
             return
         self.co2_hist.append(val)
-        if len(self.co2_hist) > self.MAX_POINTS:
-            self.co2_hist.pop(0)
+
+    def _on_canvas_draw(self, event):
+        # After a full draw (incl. resize): cache the background, paint the animated line
+        self._bg = self.canvas.copy_from_bbox(self.ax.bbox)
+        self.ax.draw_artist(self.line)
 
     def _redraw_graph(self):
         if not matplotlib:
             return
-        self.ax.cla()
-        self.ax.set_facecolor("#0F0F0F")
-        self.ax.grid(True, alpha=0.2)
-        self.ax.set_ylabel("ppm")
-        self.ax.set_xlabel("samples")
-        if len(self.co2_hist) < 2:
-            self.ax.set_title("Waiting for CO₂ data…")
+        # Line2D is created once in _build_ui; only its data and limits change.
+        # Unchanged limits -> blit the line only, otherwise a full draw.
+        n = len(self.co2_hist)
+        if n < 2:
+            self.line.set_data([], [])
+            self._title.set_text("Waiting for CO₂ data…")
             self.canvas.draw_idle()
             return
-        vmin = min(self.co2_hist)
-        vmax = max(self.co2_hist)
+        full = self._title.get_text() != ""
+        self._title.set_text("")
+        ys = self.co2_hist.values()
+        vmin = float(ys.min())
+        vmax = float(ys.max())
         pad = max(50.0, 0.08 * (vmax - vmin + 1))
-        ymin, ymax, _ = nice_scale(max(350.0, vmin - pad), vmax + pad, 5)
-        self.ax.set_ylim([ymin, ymax])
-        self.ax.plot(self.co2_hist, lw=2, color='deepskyblue')
-        self.canvas.draw_idle()
+        ymin, ymax, _ = nice_scale_cached(max(350.0, vmin - pad), vmax + pad, 5)
+        self.line.set_data(self.co2_hist.xdata(), ys)
+        if (0, n - 1) != self.ax.get_xlim():
+            self.ax.set_xlim(0, n - 1)
+            full = True
+        if (ymin, ymax) != self.ax.get_ylim():
+            self.ax.set_ylim(ymin, ymax)
+            full = True
+        blit_or_draw(self.canvas, self.ax, self.line, self._bg, full)
+
+    def _dashboard_visible(self):
+        return (self.dashboard is not None and self.dashboard.winfo_exists()
+                and self.dashboard.state() not in ("withdrawn", "iconic"))
+
+    def _render_tick(self):
+        if self._plot_dirty:
+            self._plot_dirty = False
+            self._redraw_graph()
+            if self._dashboard_visible():
+                try:
+                    self.dashboard.redraw()
+                except Exception:
+                    pass
+        self.after(self._render_period_ms, self._render_tick)
 
     # ----- MQTT handling -----
     def _toggle_connect(self):
@@ -489,6 +714,9 @@ class IAQApp(tk.Tk):
 
         try:
             self.mqtt_client = mqtt.Client()
+            # Don't let paho's default in-flight window throttle bursts
+            self.mqtt_client.max_inflight_messages_set(65535)
+            self.mqtt_client.max_queued_messages_set(0)
             self.mqtt_client.on_connect = self._on_mqtt_connect
             self.mqtt_client.on_disconnect = self._on_mqtt_disconnect
             self.mqtt_client.on_message = self._on_mqtt_message
@@ -512,23 +740,30 @@ class IAQApp(tk.Tk):
         self.connect_btn.config(text="Connect")
         self._append_console("[INFO] MQTT disconnected\n")
 
+    # paho callbacks run on the network thread: never touch Tk here, go through self.q
     def _on_mqtt_connect(self, client, userdata, flags, rc):
         if rc == 0:
             self.mqtt_connected = True
-            self.connect_btn.config(text="Disconnect")
-            self._append_console("[INFO] MQTT connected\n")
+            self.q.append(("connected", True))
+            self.q.append(("console", "[INFO] MQTT connected\n"))
+            try:
+                sock = client.socket()
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            except Exception as e:
+                self.q.append(("console", f"[WARN] Socket tuning failed: {e}\n"))
             try:
                 client.subscribe(self.target_topic, qos=0)
-                self._append_console(f"[INFO] Subscribed to {self.target_topic}\n")
+                self.q.append(("console", f"[INFO] Subscribed to {self.target_topic}\n"))
             except Exception as e:
-                self._append_console(f"[ERROR] Subscribe failed: {e}\n")
+                self.q.append(("console", f"[ERROR] Subscribe failed: {e}\n"))
         else:
-            self._append_console(f"[ERROR] MQTT connect rc={rc}\n")
+            self.q.append(("console", f"[ERROR] MQTT connect rc={rc}\n"))
 
     def _on_mqtt_disconnect(self, client, userdata, rc):
         self.mqtt_connected = False
-        self.connect_btn.config(text="Connect")
-        self._append_console(f"[INFO] MQTT disconnected (rc={rc})\n")
+        self.q.append(("connected", False))
+        self.q.append(("console", f"[INFO] MQTT disconnected (rc={rc})\n"))
 
     def _on_mqtt_message(self, client, userdata, msg):
         # Push into GUI thread via queue
@@ -536,96 +771,117 @@ class IAQApp(tk.Tk):
             payload = msg.payload.decode(errors="ignore")
         except:
             payload = ""
-        self.q.put(("mqtt_line", f"{msg.topic} {payload}"))
+        self.q.append(("mqtt_line", f"{msg.topic} {payload}"))
 
         # Also parse JSON telemetry when topic matches
         if msg.topic == self.target_topic:
             try:
-                data = json.loads(payload)
-                self.q.put(("telemetry", data))
+                data = _json.loads(msg.payload)
+                self.q.append(("telemetry", data))
             except Exception as e:
-                self.q.put(("console", f"[WARN] Bad JSON payload: {e}\n"))
+                self.q.append(("console", f"[WARN] Bad JSON payload: {e}\n"))
 
     # ----- Queue pump -----
     def _poll_queue(self):
+        # Drain everything queued since the last tick; telemetry is handled
+        # as one batch so the CSV, table and plots are touched once per tick
+        telemetry_batch = []
         try:
-            while True:
-                typ, payload = self.q.get_nowait()
+            while self.q:
+                typ, payload = self.q.popleft()
                 if typ == "console":
                     self._append_console(payload)
                 elif typ == "mqtt_line":
                     self._append_console(payload + "\n")
                 elif typ == "telemetry":
-                    self._handle_telemetry(payload)
-        except queue.Empty:
+                    telemetry_batch.append(payload)
+                elif typ == "connected":
+                    self.connect_btn.config(text="Disconnect" if payload else "Connect")
+        except IndexError:
             pass
+        if telemetry_batch:
+            self._handle_telemetry_batch(telemetry_batch)
+        if self._console_dirty:
+            self._flush_console()
         self.after(60, self._poll_queue)
 
     # ----- Telemetry handling (JSON) -----
-    def _handle_telemetry(self, data: dict):
-        # Open CSV on first message
-        self._open_new_log_if_needed()
-
+    def _parse_telemetry(self, data: dict, iso: str):
+        """Build one CSV row from a payload and update the latest metrics."""
         # Extract fields with defaults
-        ms         = int(parse_flexible(data.get("ms", 0)))
-        co2_ppm    = parse_flexible(data.get("co2_ppm", 0))
-        temp_scd   = parse_flexible(data.get("temp_scd", 0))
-        hum_scd    = parse_flexible(data.get("hum_scd", 0))
-        temp_bme   = parse_flexible(data.get("temp_bme", 0))
-        hum_bme    = parse_flexible(data.get("hum_bme", 0))
-        press_hpa  = parse_flexible(data.get("press_hpa", 0))
-        gas_ohm    = parse_flexible(data.get("gas_ohm", 0))
-        iaq_index  = parse_flexible(data.get("iaq_index", 0))
+        ms         = int(_num(data.get("ms", 0)))
+        co2_ppm    = _num(data.get("co2_ppm", 0))
+        temp_scd   = _num(data.get("temp_scd", 0))
+        hum_scd    = _num(data.get("hum_scd", 0))
+        temp_bme   = _num(data.get("temp_bme", 0))
+        hum_bme    = _num(data.get("hum_bme", 0))
+        press_hpa  = _num(data.get("press_hpa", 0))
+        gas_ohm    = _num(data.get("gas_ohm", 0))
+        iaq_index  = _num(data.get("iaq_index", 0))
         iaq_status = str(data.get("iaq_status", ""))
         co2_status = str(data.get("co2_status", ""))
 
-        iso = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        room = self.room_var.get()
-        occ_disp = self.occ_var.get()
-        win_disp = self.win_var.get()
-        cond = f"{room}_{occ_disp.replace(' ','')}_{win_disp.replace(' ','')}"
+        room, occ_disp, win_disp, cond = self._cond_cached
 
-        row_vals = [
+        # Dashboard caches
+        self.co2ppm  = co2_ppm
+        self.t_bme   = temp_bme
+        self.rh_bme  = hum_bme
+        self.p_hpa   = press_hpa
+        self.gas_ohm = gas_ohm
+
+        return [
             iso, ms, co2_ppm, temp_scd, hum_scd, temp_bme, hum_bme,
             press_hpa, int(round(gas_ohm)), iaq_index, iaq_status, co2_status,
             room, occ_disp, win_disp, cond
         ]
 
-        # CSV write
-        if self.csv_writer is not None:
-            try:
-                self.csv_writer.writerow(row_vals)
-                self.log_file.flush()
-                self.rows_logged += 1
-                self.csv_status_lbl.config(text=f"CSV: wrote row {self.rows_logged} at {datetime.now().strftime('%H:%M:%S')}")
-            except Exception as e:
-                self._append_console(f"[ERROR] Failed to write CSV: {e}\n")
-
-        # Update dashboard caches and graph
-        try:
-            self.co2ppm  = co2_ppm
-            self.t_bme   = temp_bme
-            self.rh_bme  = hum_bme
-            self.p_hpa   = press_hpa
-            self.gas_ohm = gas_ohm
-        except Exception:
-            pass
+    def _handle_telemetry_batch(self, batch):
+        # Open CSV on first message
+        self._open_new_log_if_needed()
 
+        now = time.time()
+        lt = time.localtime(now)
+        iso = time.strftime("%Y-%m-%d %H:%M:%S", lt)
+        rows = [self._parse_telemetry(data, iso) for data in batch]
+        co2_vals = [r[2] for r in rows]
+
+        # CSV write (handed off to _csv_writer_loop)
+        if self.log_file is not None:
+            for row_vals in rows:
+                self._csv_q.put(row_vals)
+            self.rows_logged += len(rows)
+            if int(now) != self._last_status_sec:
+                self._last_status_sec = int(now)
+                self.csv_status_lbl.config(text=f"CSV: wrote row {self.rows_logged} at {time.strftime('%H:%M:%S', lt)}")
+
+        # Dashboard history always follows; labels only while it is on screen
         if self.dashboard is not None and self.dashboard.winfo_exists():
             try:
-                self.dashboard.update_dashboard(self.co2ppm, self.t_bme, self.rh_bme, self.p_hpa, self.gas_ohm)
-                self.dashboard.append_co2_and_redraw(self.co2ppm)
+                for co2 in co2_vals:
+                    self.dashboard.append_co2(co2)
+                if self._dashboard_visible():
+                    self.dashboard.update_dashboard(self.co2ppm, self.t_bme, self.rh_bme, self.p_hpa, self.gas_ohm)
             except Exception:
                 pass
 
-        # Live plot in main window
-        self._append_co2(self.co2ppm)
-        self._redraw_graph()
+        # Live plot in main window (redrawn by _render_tick)
+        for co2 in co2_vals:
+            self._append_co2(co2)
+        self._plot_dirty = True
 
-        # Live table
+        # Live table (bounded; scrollbar detached while inserting)
         try:
-            self.table.insert("", "end", values=row_vals)
-            self.table.yview_moveto(1.0)
+            at_bottom = self.table.yview()[1] > 0.98
+            self.table.configure(yscrollcommand="")
+            for row_vals in rows[-self.TABLE_MAX_ROWS:]:
+                self._tv_children.append(self.table.insert("", "end", values=row_vals))
+            overflow = len(self._tv_children) - self.TABLE_MAX_ROWS
+            if overflow > 0:
+                self.table.delete(*[self._tv_children.popleft() for _ in range(overflow)])
+            self.table.configure(yscrollcommand=self.table_scroll_y.set)
+            if at_bottom:
+                self.table.yview_moveto(1.0)
         except Exception:
             pass
 
@@ -669,6 +925,14 @@ class IAQApp(tk.Tk):
         finally:
             self.dashboard = None
 
+    # ----- Shutdown -----
+    def _on_close(self):
+        # Write out any buffered rows before the process exits
+        if self.mqtt_client is not None:
+            self._disconnect_mqtt()
+        self._close_log()
+        self.destroy()
+
 
 if __name__ == "__main__":
     app = IAQApp()
@@ -13,10 +13,12 @@ MQTT Edition + Debug Tab (JSON + QoS + Latency)
   raw JSON viewer, and live latency/rate stats
 """
 
-import os, sys, csv, time, math, threading, queue, statistics, json, random
+import os, sys, time, math, threading, json, array, struct, mmap
 from collections import deque
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
@@ -30,13 +32,39 @@ import matplotlib.pyplot as plt
 # MQTT
 import paho.mqtt.client as mqtt
 
+# Payload decoding: orjson if available (parses the raw payload bytes directly)
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+# pandas (optional): C CSV parser for calibration imports, numpy otherwise
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+# Numba (optional): JIT the threshold search and synthetic RMS window, plain Python otherwise
+try:
+    from numba import njit
+except Exception:
+    def njit(*args, **kwargs):
+        return lambda f: f
+
 # ---------------- Constants ----------------
 MAX_HP  = 0.6
 MAX_RMS = 0.6
 CAPACITY = 800    # ~8s at 100 Hz
+RATE_NOMINAL = 100.0
+RATE_DRIFT = 0.05  # rescale the time axis once the rate estimate drifts >5%
 
 MIN_SAMPLES_PER_CLASS = 30
 DEBUG_ROWS = 400          # table capacity
+LABELS = ("CALM", "STRUCT", "FOOT", "PLAY", "JUMP")
+
+# Packed IMU record (firmware IMU_BINARY_WIRE=1): uint32 ms, 6×float32
+# (ax, ay, az, mag, hp_abs, rms), NUL-padded label — 44 bytes, little-endian
+IMU_WIRE = struct.Struct("<I6f16s")
 
 # Colors (RGB normalized for matplotlib)
 CLR_HP   = (0/255, 191/255, 255/255)   # DeepSkyBlue
@@ -47,9 +75,22 @@ CLR_WARN   = (255/255, 200/255, 87/255)
 CLR_PLAY   = (255/255, 179/255, 71/255)
 CLR_BAD    = (255/255,  90/255, 95/255)
 
+# Status chip fill per label (Tk hex strings, computed once); anything else is CALM
+def _tk_hex(rgb01):
+    return "#%02x%02x%02x" % tuple(int(255*x) for x in rgb01)
+
+COLOR_TABLE = {"JUMP": _tk_hex(CLR_BAD), "PLAY": _tk_hex(CLR_PLAY),
+               "FOOT": _tk_hex(CLR_WARN), "STRUCT": _tk_hex(CLR_STRUCT)}
+CHIP_CALM = _tk_hex(CLR_CALM)
+
+# Thresholds file keys -> App attributes
+THRESHOLD_KEYS = {"TH_STRUCT": "th_struct", "TH_FOOT": "th_foot", "TH_KID": "th_kid", "TH_JUMP": "th_jump"}
+
 # -------------- Data structures --------------
+# __slots__ (no per-instance __dict__): one of each is allocated per message
 @dataclass
 class Sample:
+    __slots__ = ("ms", "ax", "ay", "az", "mag", "hp_abs", "rms", "label")
     ms: int
     ax: float
     ay: float
@@ -61,16 +102,55 @@ class Sample:
 
 @dataclass
 class MqttFrame:
+    __slots__ = ("topic", "qos", "recv_ts", "raw_json", "sample")
     topic: str
     qos: int
     recv_ts: float     # local time (seconds since epoch)
-    raw_json: str
+    raw_json: Optional[Union[str, bytes]]   # JSON payload as received; None for binary/sim frames
     sample: Sample     # parsed Sample (with device ms)
 
 # -------------- Utils --------------
 def clamp(v, lo, hi):
     return lo if v < lo else (hi if v > hi else v)
 
+class SlidingStats:
+    """Mean/min/max of the last `size` values, updated in O(1) amortized per push."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._vals = deque(maxlen=size)
+        self._sum = 0.0
+        self._seq = 0
+        self._min = deque()   # (seq, value) with increasing values
+        self._max = deque()   # (seq, value) with decreasing values
+
+    def __len__(self):
+        return len(self._vals)
+
+    def push(self, v: float):
+        if len(self._vals) == self.size:
+            self._sum -= self._vals[0]
+        self._vals.append(v)
+        self._sum += v
+        seq = self._seq
+        self._seq += 1
+        mn, mx = self._min, self._max
+        while mn and mn[-1][1] >= v: mn.pop()
+        while mx and mx[-1][1] <= v: mx.pop()
+        mn.append((seq, v)); mx.append((seq, v))
+        # At most one entry falls out of the window per push
+        if mn[0][0] <= seq - self.size: mn.popleft()
+        if mx[0][0] <= seq - self.size: mx.popleft()
+
+    def mean(self) -> float:
+        return self._sum / len(self._vals)
+
+    def min(self) -> float:
+        return self._min[0][1]
+
+    def max(self) -> float:
+        return self._max[0][1]
+
 def compute_label_from_rms_custom(rms, th_struct, th_foot, th_kid, th_jump):
     if rms >= th_jump: return "JUMP"
     if rms >= th_kid:  return "PLAY"
@@ -78,62 +158,62 @@ def compute_label_from_rms_custom(rms, th_struct, th_foot, th_kid, th_jump):
     if rms >= th_struct: return "STRUCT"
     return "CALM"
 
-def clean_rms(lst: List[float]) -> List[float]:
-    out = []
-    for v in lst:
-        if v is None or math.isnan(v) or math.isinf(v):
-            continue
-        out.append(clamp(v, 0.0, 1.0))
+def clean_rms(lst: List[float]) -> np.ndarray:
+    """Drop None/NaN/inf values and clip the rest to [0, 1]."""
+    arr = np.asarray(lst, dtype=np.float64)
+    if not arr.size:
+        return arr
+    arr = arr[np.isfinite(arr)]
+    np.clip(arr, 0.0, 1.0, out=arr)
+    return arr
+
+@njit(cache=True)
+def _best_boundary(a, b):
+    a = np.sort(a)
+    b = np.sort(b)
+    uniq = np.unique(np.concatenate((a, b)))
+    # Counts of a/b at or below each unique value
+    cumA = np.searchsorted(a, uniq, side='right')
+    cumB = np.searchsorted(b, uniq, side='right')
+
+    # Candidates: below everything, midpoints, above everything
+    m = uniq.size
+    cands = np.empty(m + 1)
+    cands[0] = uniq[0] - 1e-6
+    cands[1:m] = 0.5*(uniq[:-1] + uniq[1:])
+    cands[m] = uniq[-1] + 1e-6
+    err = np.empty(m + 1, np.int64)
+    err[0] = a.size
+    err[1:] = (a.size - cumA) + cumB
+    return cands[np.argmin(err)]
+
+@njit(cache=True)
+def _rolling_rms(x, win):
+    """Trailing RMS over up to `win` samples (shorter window at the start)."""
+    n = x.size
+    out = np.empty(n)
+    buf = np.zeros(win)
+    sumsq = 0.0
+    for i in range(n):
+        j = i % win
+        v = x[i] * x[i]
+        sumsq += v - buf[j]
+        buf[j] = v
+        out[i] = math.sqrt(max(sumsq, 0.0) / min(i + 1, win))
     return out
 
-def try_boundary(lower: List[float], higher: List[float]) -> Tuple[bool, float]:
+def try_boundary(lower: np.ndarray, higher: np.ndarray) -> Tuple[bool, float]:
     """Minimize overlap error between adjacent classes to pick threshold."""
-    if not lower or not higher:
+    if len(lower) == 0 or len(higher) == 0:
         return False, 0.0
-    a = sorted(lower)
-    b = sorted(higher)
-    comb = sorted(a + b)
-    uniq = []
-    last = None
-    for v in comb:
-        if last is None or abs(v - last) > 1e-12:
-            uniq.append(v)
-            last = v
-    nA, nB = len(a), len(b)
-    cumA, cumB = [0]*len(uniq), [0]*len(uniq)
-    iA = iB = 0
-    for i, v in enumerate(uniq):
-        while iA < nA and a[iA] <= v: iA += 1
-        while iB < nB and b[iB] <= v: iB += 1
-        cumA[i] = iA
-        cumB[i] = iB
-
-    best_err = float('inf'); best_t = uniq[0]
-    for i in range(-1, len(uniq)):
-        if i == -1:
-            t = uniq[0] - 1e-6
-            a_le = 0; b_le = 0
-        elif i == len(uniq)-1:
-            t = uniq[i] + 1e-6
-            a_le = cumA[i]; b_le = cumB[i]
-        else:
-            t = 0.5*(uniq[i] + uniq[i+1])
-            a_le = cumA[i]; b_le = cumB[i]
-        a_gt = nA - a_le
-        b_leq = b_le
-        err = a_gt + b_leq
-        if err < best_err:
-            best_err = err
-            best_t = t
-    return True, best_t
+    a = np.asarray(lower, dtype=np.float64)
+    b = np.asarray(higher, dtype=np.float64)
+    return True, float(_best_boundary(a, b))
 
 def compute_thresholds(calib):
     """Return ok, th_struct, th_foot, th_kid, th_jump, msg"""
-    calm   = clean_rms(calib["CALM"])
-    struct = clean_rms(calib["STRUCT"])
-    foot   = clean_rms(calib["FOOT"])
-    play   = clean_rms(calib["PLAY"])
-    jump   = clean_rms(calib["JUMP"])
+    # calib values are array('d'): read them through zero-copy float64 views
+    calm, struct, foot, play, jump = (clean_rms(np.frombuffer(calib[k], dtype=np.float64)) for k in LABELS)
     if not all(len(lst) >= MIN_SAMPLES_PER_CLASS for lst in [calm, struct, foot, play, jump]):
         return (False, 0,0,0,0, f"Need ≥{MIN_SAMPLES_PER_CLASS} samples per class.")
     ok1, thStruct = try_boundary(calm, struct)
@@ -149,6 +229,74 @@ def compute_thresholds(calib):
     thJump   = clamp(max(thJump, thKid   +eps), 0.001, 1.0)
     return (True, thStruct, thFoot, thKid, thJump, "OK")
 
+SIM_DTYPE = [("ms","f8"), ("ax","f8"), ("ay","f8"), ("az","f8"),
+             ("mag","f8"), ("hp_abs","f8"), ("rms","f8"), ("label","U16")]
+
+def load_sim_rows(src) -> np.ndarray:
+    """Parse IMU CSV rows (path or list of lines) into a structured array; label is optional."""
+    if isinstance(src, str):
+        with open(src, "r", encoding="utf-8") as f:
+            src = f.read().splitlines()
+    # One shape for genfromtxt: label-less rows get an empty 8th field, short rows are dropped
+    rows = []
+    for ln in src:
+        ln = ln.strip()
+        if not ln or ln.startswith("#"):
+            continue
+        n = ln.count(",")
+        if n >= 7:
+            rows.append(ln)
+        elif n == 6:
+            rows.append(ln + ",")
+    arr = np.atleast_1d(np.genfromtxt(rows, dtype=SIM_DTYPE, delimiter=",", comments="#", usecols=range(8),
+                                      encoding="utf-8", autostrip=True, invalid_raise=False))
+    # Skip rows with an unparsable number, like the per-line float() parse did
+    ok = np.ones(arr.shape, dtype=bool)
+    for name, _ in SIM_DTYPE[:7]:
+        ok &= np.isfinite(arr[name])
+    arr = arr[ok]
+    arr["label"] = np.char.upper(arr["label"])
+    arr["label"][arr["label"] == ""] = "CALM"
+    return arr
+
+def scan_csv_column(path, col=6, chunk=100_000):
+    """Yield array('d') chunks of one numeric CSV column, scanning an mmap of the file.
+
+    Only the wanted field is sliced out of each line; comment, short and
+    unparsable rows are skipped.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with mm:
+        out = array.array("d")
+        end_all = len(mm)
+        pos = 0
+        while pos < end_all:
+            eol = mm.find(b"\n", pos)
+            if eol < 0:
+                eol = end_all
+            if mm[pos:pos+1] != b"#":
+                start = pos
+                for _ in range(col):
+                    start = mm.find(b",", start, eol)
+                    if start < 0:
+                        break
+                    start += 1
+                if start >= 0:
+                    stop = mm.find(b",", start, eol)
+                    try:
+                        out.append(float(mm[start:eol if stop < 0 else stop]))
+                    except ValueError:
+                        pass
+                    if len(out) >= chunk:
+                        yield out
+                        out = array.array("d")
+            pos = eol + 1
+        if out:
+            yield out
+
 # -------------- MQTT Reader Thread --------------
 class MqttReader(threading.Thread):
     def __init__(self, host, port, topic, out_queue, on_status, on_closed):
@@ -180,21 +328,20 @@ class MqttReader(threading.Thread):
             self.client.on_disconnect = self._on_disconnect
 
             self.client.connect(self.host, self.port, keepalive=30)
-            self.client.loop_start()
-            while not self._stop:
-                time.sleep(0.05)
+            # paho's network loop runs on this thread until stop() disconnects
+            if not self._stop:
+                self.client.loop_forever()
         except Exception as e:
             self.on_status(f"MQTT error: {e}")
         finally:
-            try:
-                self.client.loop_stop()
-                self.client.disconnect()
-            except:
-                pass
             self.on_closed()
 
     def stop(self):
         self._stop = True
+        try:
+            self.client.disconnect()   # makes loop_forever return
+        except:
+            pass
 
     # Compatible on_connect: paho2: (client, userdata, flags, rc, properties)
     #                        paho1: (client, userdata, flags, rc)
@@ -219,8 +366,22 @@ class MqttReader(threading.Thread):
     def _on_message(self, client, userdata, msg):
         try:
             recv_ts = time.time()
-            payload = msg.payload.decode("utf-8", errors="ignore")
-            d = json.loads(payload)
+            payload = msg.payload
+            is_bin = len(payload) == IMU_WIRE.size
+            if is_bin and payload[:1] == b"{":
+                # 44-byte JSON, or a record whose ms low byte happens to be '{'
+                try:
+                    _json.loads(payload)
+                    is_bin = False
+                except ValueError:
+                    pass
+            if is_bin:
+                ms, ax, ay, az, mag, hp_abs, rms, label = IMU_WIRE.unpack(payload)
+                smp = Sample(ms, ax, ay, az, mag, hp_abs, rms,
+                             label.rstrip(b"\x00").decode("ascii", "ignore").upper() or "CALM")
+                self.out_queue.append(MqttFrame(msg.topic, int(getattr(msg, "qos", 0)), recv_ts, None, smp))
+                return
+            d = _json.loads(payload)
             smp = Sample(
                 ms   = int(float(d.get("ms", 0))),
                 ax   = float(d.get("ax", 0.0)),
@@ -238,15 +399,17 @@ class MqttReader(threading.Thread):
                 raw_json = payload,
                 sample = smp
             )
-            self.out_queue.put(frame)
+            self.out_queue.append(frame)
         except Exception:
             pass  # ignore malformed frames
 
 # -------------- Simulation Thread --------------
 class SimReader(threading.Thread):
-    def __init__(self, lines, rate_hz, loop, out_queue, on_finished):
+    def __init__(self, rows, rate_hz, loop, out_queue, on_finished):
         super().__init__(daemon=True)
-        self.lines = lines
+        # Built once from the structured array; replay loops just reuse them
+        self.samples = [Sample(int(ms), ax, ay, az, mag, hp, rms, lbl) for ms, ax, ay, az, mag, hp, rms, lbl
+                        in zip(*(rows[name].tolist() for name, _ in SIM_DTYPE))]
         self.rate_hz = max(1.0, float(rate_hz or 100.0))
         self.loop = loop
         self.out_queue = out_queue
@@ -256,31 +419,17 @@ class SimReader(threading.Thread):
     def run(self):
         delay = 1.0 / self.rate_hz
         i = 0
-        n = len(self.lines)
+        n = len(self.samples)
         while not self._stop:
             if n <= 0: break
             if i >= n:
                 if not self.loop: break
                 i = 0
-            line = self.lines[i].strip(); i += 1
-            if line and not line.startswith("#"):
-                p = [x.strip() for x in line.split(",")]
-                if len(p) >= 7:
-                    try:
-                        smp = Sample(
-                            ms=int(float(p[0])),
-                            ax=float(p[1]), ay=float(p[2]), az=float(p[3]),
-                            mag=float(p[4]), hp_abs=float(p[5]),
-                            rms=float(p[6]),
-                            label=p[7].upper() if len(p) >= 8 and p[7] else "CALM"
-                        )
-                        frame = MqttFrame(topic="simulation", qos=0, recv_ts=time.time(),
-                                          raw_json=json.dumps({
-                                              "ms":smp.ms,"ax":smp.ax,"ay":smp.ay,"az":smp.az,
-                                              "mag":smp.mag,"hp_abs":smp.hp_abs,"rms":smp.rms,"label":smp.label
-                                          }), sample=smp)
-                        self.out_queue.put(frame)
-                    except: pass
+            smp = self.samples[i]; i += 1
+            # raw_json=None: the viewer renders the sample if it shows this frame
+            frame = MqttFrame(topic="simulation", qos=0, recv_ts=time.time(),
+                              raw_json=None, sample=smp)
+            self.out_queue.append(frame)
             time.sleep(delay)
         self.on_finished()
 
@@ -295,17 +444,26 @@ class App(tk.Tk):
         self.geometry("1280x900")
 
         # state
-        self.frame_queue = queue.Queue()
+        # Readers append, _drain_pump pops: deque ops are atomic, so no lock needed.
+        # Bounded so the oldest frames are dropped if the UI falls behind.
+        self.frame_queue = deque(maxlen=10000)
         self.mqtt_thread = None
         self.sim_thread = None
         self.simulating = False
-        self.sim_lines = []
+        self.sim_rows = None   # structured array (SIM_DTYPE), parsed once on load
         self.logging = False
         self.log_fp = None
+        self._log_rows = []            # CSV lines written once per drain tick
+        self._log_flushed = 0.0        # monotonic time of last log flush
         self.log_path = ""
 
-        self.hp_series  = deque(maxlen=CAPACITY)
-        self.rms_series = deque(maxlen=CAPACITY)
+        # Plot series: preallocated ring buffers (write index wraps at CAPACITY)
+        self._hp_buf  = np.zeros(CAPACITY, np.float32)
+        self._rms_buf = np.zeros_like(self._hp_buf)
+        self._buf_idx = 0
+        self._buf_full = False
+        self._x = np.arange(CAPACITY) / RATE_NOMINAL   # seconds; see _rebuild_x
+        self._drawn_rate = RATE_NOMINAL
 
         self.rate_hz_est = 100.0
         self._last_ms = -1
@@ -318,16 +476,33 @@ class App(tk.Tk):
 
         self.calibrating = False
         self.calib_active_label = "CALM"
-        self.calib = { "CALM":[], "STRUCT":[], "FOOT":[], "PLAY":[], "JUMP":[] }
+        self.calib = {k: array.array('d') for k in LABELS}   # packed float64 RMS samples
+        # (label, float64 chunk) from the data-CSV import thread; (None, msg) when done
+        self._calib_import_q = deque()
 
         # Debug buffers
-        self.debug_rows = deque(maxlen=DEBUG_ROWS)   # tuples for table
-        self.lat_samples = deque(maxlen=1000)        # latency ms
+        self._pending_tbl_rows = deque(maxlen=DEBUG_ROWS)  # (frame, latency) not yet in the table
+        self._tbl_iids = deque()                           # table iids, oldest first
+        self.lat_stats = SlidingStats(1000)          # latency ms
         self.arrival_ts  = deque(maxlen=1000)        # recv_ts for rate
-        self._last_raw_json = None
+        self._last_frame = None
+        self._last_displayed_frame = None
+        self._json_last = 0.0          # monotonic time of last JSON viewer update
+        self._json_catchup = False     # viewer update scheduled for the end of the throttle window
+
+        # Ingestion vs rendering: _drain_pump (16 ms) fills buffers and marks
+        # the UI dirty; _render_pump (50 ms) repaints labels, plots and tables
+        self._dirty = False
+        self._redraw_pending = False
+        self._last_sample = None
+        self._last_latency_ms = None
+        self._last_sec = -1            # recv second whose "%H:%M:%S" is cached
+        self._last_sec_str = ""
 
         self._build_ui()
-        self.after(16, self._ui_pump)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.after(16, self._drain_pump)
+        self.after(50, self._render_pump)
 
     # ---------- UI ----------
     def _build_ui(self):
@@ -365,6 +540,8 @@ class App(tk.Tk):
         f3 = ttk.LabelFrame(tab1, text="Status"); f3.pack(fill="x", padx=4, pady=6)
         self.status_lbl = ttk.Label(f3, text="—", font=("TkDefaultFont", 14, "bold")); self.status_lbl.pack(side="left", padx=6)
         self.status_chip = tk.Canvas(f3, width=20, height=20, highlightthickness=0); self.status_chip.pack(side="left")
+        self._chip_rect = self.status_chip.create_rectangle(0,0,20,20, width=0)   # recoloured in place
+        self._last_status = None   # label currently shown by _update_status
         self._set_chip((60,60,60))
         self.lbl_rms = ttk.Label(f3, text="RMS: —"); self.lbl_rms.pack(side="left", padx=8)
         self.lbl_hp  = ttk.Label(f3, text="HP: —");  self.lbl_hp.pack(side="left", padx=8)
@@ -373,7 +550,7 @@ class App(tk.Tk):
         # Plot options
         f4 = ttk.Frame(tab1); f4.pack(fill="x", padx=4, pady=4)
         self.show_thresh_var = tk.BooleanVar(value=True)
-        ttk.Checkbutton(f4, text="Show Thresholds", variable=self.show_thresh_var, command=self.redraw_all).pack(side="right")
+        ttk.Checkbutton(f4, text="Show Thresholds", variable=self.show_thresh_var, command=self._request_redraw).pack(side="right")
 
         # Plots
         fplots = ttk.Frame(tab1); fplots.pack(fill="both", expand=True, padx=4, pady=6)
@@ -381,21 +558,28 @@ class App(tk.Tk):
         self.fig.tight_layout(pad=3)
         self.ax_hp.set_title("HP Magnitude (g)")
         self.ax_hp.set_xlabel("time (s, scroll →)"); self.ax_hp.set_ylabel("g"); self.ax_hp.set_ylim(0, MAX_HP)
-        self.hp_line, = self.ax_hp.plot([], [], color=CLR_HP, lw=1.8, antialiased=True)
+        self.hp_line, = self.ax_hp.plot([], [], color=CLR_HP, lw=1.8, antialiased=True, animated=True)
         self.ax_rms.set_title("RMS (g)")
         self.ax_rms.set_xlabel("time (s, scroll →)"); self.ax_rms.set_ylabel("g"); self.ax_rms.set_ylim(0, MAX_RMS)
-        self.rms_line, = self.ax_rms.plot([], [], color=CLR_RMS, lw=1.8, antialiased=True)
+        self.rms_line, = self.ax_rms.plot([], [], color=CLR_RMS, lw=1.8, antialiased=True, animated=True)
+        self.ax_hp.set_xlim(0, self._x[-1])
+        self.ax_rms.set_xlim(0, self._x[-1])
         self.th_struct_line = self.ax_rms.axhline(self.th_struct, color=CLR_STRUCT, lw=1.0, ls="--")
         self.th_foot_line   = self.ax_rms.axhline(self.th_foot,   color=CLR_WARN,   lw=1.0, ls="--")
         self.th_kid_line    = self.ax_rms.axhline(self.th_kid,    color=CLR_PLAY,   lw=1.0, ls="--")
         self.th_jump_line   = self.ax_rms.axhline(self.th_jump,   color=CLR_BAD,    lw=1.0, ls="--")
         self.canvas = FigureCanvasTkAgg(self.fig, master=fplots)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        # Blitting: axes, ticks and threshold lines are the cached background;
+        # only the two animated data lines are repainted per frame
+        self._bg_hp = self._bg_rms = None
+        self._static_state = None
+        self.canvas.mpl_connect("draw_event", self._on_canvas_draw)
 
         # Calibration block
         f2 = ttk.LabelFrame(tab1, text="Calibration"); f2.pack(fill="x", padx=4, pady=6)
         ttk.Label(f2, text="Label:").pack(side="left")
-        self.calib_combo = ttk.Combobox(f2, values=["CALM","STRUCT","FOOT","PLAY","JUMP"], width=10, state="readonly")
+        self.calib_combo = ttk.Combobox(f2, values=list(LABELS), width=10, state="readonly")
         self.calib_combo.set("CALM"); self.calib_combo.bind("<<ComboboxSelected>>", self._calib_label_changed)
         self.calib_combo.pack(side="left", padx=4)
         self.btn_calib_start = ttk.Button(f2, text="Start", command=self.calib_start); self.btn_calib_start.pack(side="left", padx=2)
@@ -498,10 +682,8 @@ class App(tk.Tk):
         path = filedialog.askopenfilename(title="Load CSV", filetypes=[("CSV files","*.csv"),("All files","*.*")])
         if not path: return
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                lines = [ln.strip() for ln in f if ln.strip()]
-            self.sim_lines = [ln for ln in lines if not ln.startswith("#")]
-            self.sim_file_lbl.config(text=os.path.basename(path)+f" ({len(self.sim_lines)} lines)")
+            self.sim_rows = load_sim_rows(path)
+            self.sim_file_lbl.config(text=os.path.basename(path)+f" ({len(self.sim_rows)} lines)")
             self.btn_start_sim.config(state="normal")
         except Exception as e:
             self._toast(f"Failed to load: {e}")
@@ -515,12 +697,12 @@ class App(tk.Tk):
         except:
             rate = 100.0
         loop = bool(self.sim_loop_var.get())
-        if not self.sim_lines:
+        if self.sim_rows is None or not len(self.sim_rows):
             # synthetic 30s
-            self.sim_lines = self._generate_synthetic_csv(30, rate)
-            self.sim_file_lbl.config(text=f"Synthetic 30s @ {rate:.0f} Hz ({len(self.sim_lines)} lines)")
-        self.hp_series.clear(); self.rms_series.clear(); self.redraw_all()
-        self.sim_thread = SimReader(self.sim_lines, rate, loop, self.frame_queue, self._sim_finished)
+            self.sim_rows = self._generate_synthetic_rows(30, rate)
+            self.sim_file_lbl.config(text=f"Synthetic 30s @ {rate:.0f} Hz ({len(self.sim_rows)} lines)")
+        self._clear_series(); self._request_redraw()
+        self.sim_thread = SimReader(self.sim_rows, rate, loop, self.frame_queue, self._sim_finished)
         self.sim_thread.start()
         self.simulating = True
         self.btn_start_sim.config(state="disabled")
@@ -535,7 +717,7 @@ class App(tk.Tk):
 
     def _sim_finished(self):
         self.simulating = False
-        self.btn_start_sim.config(state="normal" if self.sim_lines else "disabled")
+        self.btn_start_sim.config(state="normal" if self.sim_rows is not None and len(self.sim_rows) else "disabled")
         self.btn_stop_sim.config(state="disabled")
         self.status_lbl.config(text="Simulation Stopped"); self._set_chip((60,60,60))
 
@@ -546,7 +728,7 @@ class App(tk.Tk):
                 logdir = os.path.join(os.path.expanduser("~"), "IMU6500Logs")
                 os.makedirs(logdir, exist_ok=True)
                 path = os.path.join(logdir, time.strftime("imu6500_%Y%m%d_%H%M%S.csv"))
-                self.log_fp = open(path, "w", encoding="utf-8", newline="")
+                self.log_fp = open(path, "w", encoding="utf-8", newline="", buffering=1 << 16)
                 self.log_fp.write("#HDR ms,ax,ay,az,mag,hp_abs,rms,label\n")
                 self.logging = True; self.log_path = path
                 self.btn_log.config(text="Stop Logging"); self.btn_openlog.config(state="normal")
@@ -568,138 +750,277 @@ class App(tk.Tk):
             return
         os.system(f'xdg-open "{self.log_path}" >/dev/null 2>&1 &')
 
-    # ---------- UI pump ----------
-    def _ui_pump(self):
+    def _on_close(self):
+        # Write out buffered log rows before the window goes away
+        self.disconnect_mqtt()
+        if self.sim_thread:
+            self.sim_thread.stop()
+        if self.logging:
+            self.toggle_logging()
+        self.destroy()
+
+    # ---------- UI pumps ----------
+    def _drain_pump(self):
+        if self._calib_import_q:
+            self._drain_calib_imports()
         drained = 0
-        last_latency_ms = None
-        last_raw_json = None
-
-        while drained < 500 and not self.frame_queue.empty():
-            frame = self.frame_queue.get()
-            if not isinstance(frame, MqttFrame):
-                continue
+        calib_added = 0
+        now_ms = time.time() * 1000.0
+        first_ms = last_ms = -1
+        n_ms = 0
+        log_append = self._log_rows.append if self.logging and self.log_fp else None
+        # Hot-loop locals: LOAD_FAST instead of global/attribute lookups per frame
+        _clamp = clamp
+        popleft = self.frame_queue.popleft
+        hp_buf, rms_buf = self._hp_buf, self._rms_buf
+        idx = self._buf_idx
+        calib_append = self.calib[self.calib_active_label].append if self.calibrating else None
+        arrival_append = self.arrival_ts.append
+        lat_push = self.lat_stats.push
+        tbl_append = self._pending_tbl_rows.append
+        frame = latency_ms = None
+
+        while drained < 500:
+            try:
+                frame = popleft()
+            except IndexError:
+                break
+            assert isinstance(frame, MqttFrame)  # both readers only queue MqttFrame
 
             smp = frame.sample
 
             # Logging (CSV)
-            if self.logging and self.log_fp:
-                self.log_fp.write(f"{smp.ms},{smp.ax:.4f},{smp.ay:.4f},{smp.az:.4f},{smp.mag:.4f},{smp.hp_abs:.4f},{smp.rms:.4f},{smp.label}\n")
+            if log_append is not None:
+                log_append(f"{smp.ms},{smp.ax:.4f},{smp.ay:.4f},{smp.az:.4f},{smp.mag:.4f},{smp.hp_abs:.4f},{smp.rms:.4f},{smp.label}")
 
-            # Rate estimate from device ms (plots) and arrival_ts (stats)
+            # Device ms span of this batch (rate estimate after the loop)
             if smp.ms > 0:
-                if self._last_ms >= 0:
-                    d = smp.ms - self._last_ms
-                    if d > 0:
-                        inst = 1000.0 / d
-                        self._ema_rate = 0.9*self._ema_rate + 0.1*inst
-                        self.rate_hz_est = self._ema_rate
-                self._last_ms = smp.ms
+                if first_ms < 0:
+                    first_ms = smp.ms
+                last_ms = smp.ms
+                n_ms += 1
 
             # Update time-series for plots
-            self.hp_series.append(clamp(smp.hp_abs, 0.0, MAX_HP))
-            self.rms_series.append(clamp(smp.rms, 0.0, MAX_RMS))
+            hp_buf[idx]  = _clamp(smp.hp_abs, 0.0, MAX_HP)
+            rms_buf[idx] = _clamp(smp.rms, 0.0, MAX_RMS)
+            idx += 1
+            if idx == CAPACITY:
+                idx = 0
+                self._buf_full = True
 
             # Calibration capture
-            if self.calibrating:
-                self.calib[self.calib_active_label].append(smp.rms)
-                self.btn_compute.config(state="normal")
-                if sum(len(v) for v in self.calib.values()) % 50 == 0:
-                    self._update_calib_counts()
-
-            # Status text + chip
-            self.lbl_hp.config(text=f"HP: {smp.hp_abs:.3f}")
-            self.lbl_rms.config(text=f"RMS: {smp.rms:.3f}")
-            self.lbl_mag.config(text=f"Mag: {smp.mag:.3f}")
-            self._update_status(smp.label)
+            if calib_append is not None:
+                calib_append(smp.rms)
+                calib_added += 1
 
             # Debug tab: latency & table
-            self.arrival_ts.append(frame.recv_ts)
-            now_ms = time.time() * 1000.0
+            arrival_append(frame.recv_ts)
             latency_ms = max(0.0, now_ms - float(smp.ms)) if smp.ms > 0 else 0.0
-            self.lat_samples.append(latency_ms)
-            last_latency_ms = latency_ms
-
-            lt = time.strftime("%H:%M:%S", time.localtime(frame.recv_ts)) + f".{int((frame.recv_ts%1)*1000):03d}"
-            row = (lt, smp.ms, frame.qos, f"{latency_ms:.1f}", smp.label, f"{smp.rms:.3f}", f"{smp.hp_abs:.3f}", frame.topic)
-            self.debug_rows.append(row)
-
-            last_raw_json = frame.raw_json
-            self._last_raw_json = frame.raw_json
+            lat_push(latency_ms)
+            tbl_append((frame, latency_ms))   # formatted on display
 
             drained += 1
 
+        self._buf_idx = idx
+        if self._log_rows:
+            self.log_fp.write("\n".join(self._log_rows) + "\n")
+            self._log_rows.clear()
+        if self.log_fp:
+            # Flush at most once a second so Open Log and a crash see recent rows
+            t = time.monotonic()
+            if t - self._log_flushed >= 1.0:
+                self.log_fp.flush()
+                self._log_flushed = t
+        if drained:
+            self._last_frame = frame
+            self._last_sample = frame.sample
+            self._last_latency_ms = latency_ms
+        if n_ms:
+            # One EMA step per batch using its mean inter-sample interval
+            if self._last_ms >= 0:
+                first_ms, steps = self._last_ms, n_ms
+            else:
+                steps = n_ms - 1
+            if steps > 0 and last_ms > first_ms:
+                inst = steps * 1000.0 / (last_ms - first_ms)
+                self._ema_rate = 0.9*self._ema_rate + 0.1*inst
+                self.rate_hz_est = self._ema_rate
+            self._last_ms = last_ms
+        if calib_added:
+            # Once per tick; counts label refreshed every 50 samples
+            self.btn_compute.config(state="normal")
+            total = sum(len(v) for v in self.calib.values())
+            if total // 50 != (total - calib_added) // 50:
+                self._update_calib_counts()
         if drained:
+            self._dirty = True
+        self.after(16, self._drain_pump)
+
+    def _render_pump(self):
+        if self._dirty:
+            self._dirty = False
+            smp = self._last_sample
+
+            # Status text + chip
+            self.lbl_hp.config(text=f"HP: {smp.hp_abs:.3f}")
+            self.lbl_rms.config(text=f"RMS: {smp.rms:.3f}")
+            self.lbl_mag.config(text=f"Mag: {smp.mag:.3f}")
+            self._update_status(smp.label)
+
             self.redraw_all()
             self._refresh_debug_table()
-            self._refresh_json_viewer(last_raw_json or self._last_raw_json)
-            self._refresh_stats(last_latency_ms)
+            self._refresh_json_viewer(self._last_frame)
+            # Debug tab hidden (other tab, minimised): the aggregators keep
+            # updating in the drain, only the label refresh is skipped
+            if self.lbl_avg_lat.winfo_viewable():
+                self._refresh_stats(self._last_latency_ms)
+                self._last_latency_ms = None
 
-        self.after(16, self._ui_pump)
+        self.after(50, self._render_pump)
 
     # ---------- Drawing ----------
+    def _request_redraw(self):
+        # Coalesce event-driven redraws (threshold edits, toggles) into one per frame
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after(16, self._flush_redraw)
+
+    def _flush_redraw(self):
+        self._redraw_pending = False
+        self.redraw_all()
+
+    def _clear_series(self):
+        self._buf_idx = 0
+        self._buf_full = False
+
+    def _series(self, buf):
+        """Oldest-first view of a ring buffer (copies only once it has wrapped)."""
+        if not self._buf_full:
+            return buf[:self._buf_idx]
+        return np.concatenate((buf[self._buf_idx:], buf[:self._buf_idx]))
+
+    def _on_canvas_draw(self, event):
+        # After a full draw (incl. resize): cache backgrounds, paint the animated lines
+        self._bg_hp = self.canvas.copy_from_bbox(self.ax_hp.bbox)
+        self._bg_rms = self.canvas.copy_from_bbox(self.ax_rms.bbox)
+        self.ax_hp.draw_artist(self.hp_line)
+        self.ax_rms.draw_artist(self.rms_line)
+
+    def _rebuild_x(self, rate):
+        # Time axis for a full buffer; the x limits follow it
+        self._x = np.arange(CAPACITY) / rate
+        self._drawn_rate = rate
+        self.ax_hp.set_xlim(0, self._x[-1])
+        self.ax_rms.set_xlim(0, self._x[-1])
+
     def redraw_all(self):
-        n = max(len(self.hp_series), len(self.rms_series))
+        n = CAPACITY if self._buf_full else self._buf_idx
         if n <= 1:
             self.hp_line.set_data([], [])
             self.rms_line.set_data([], [])
+            self._static_state = None
             self.canvas.draw_idle()
             return
-        rate = self.rate_hz_est if self.rate_hz_est > 1 else 100.0
-        window = (n-1) / rate
-        x = [i*(window/(n-1)) for i in range(n)]  # 0..window seconds
-
-        self.ax_hp.set_xlim(0, window)
-        self.ax_rms.set_xlim(0, window)
+        rate = self.rate_hz_est if self.rate_hz_est > 1 else RATE_NOMINAL
+        if abs(rate - self._drawn_rate) / self._drawn_rate > RATE_DRIFT:
+            self._rebuild_x(rate)
 
-        self.hp_line.set_data(x, list(self.hp_series))
-        self.rms_line.set_data(x, list(self.rms_series))
+        # Series fill the axis from the left until the buffer is full
+        x = self._x[:n]
+        self.hp_line.set_data(x, self._series(self._hp_buf))
+        self.rms_line.set_data(x, self._series(self._rms_buf))
 
-        # Threshold lines
+        # Background only needs a full redraw when limits or thresholds change
         vis = self.show_thresh_var.get()
-        for line in (self.th_struct_line, self.th_foot_line, self.th_kid_line, self.th_jump_line):
-            line.set_visible(vis)
-        self.th_struct_line.set_ydata([self.th_struct, self.th_struct])
-        self.th_foot_line.set_ydata([self.th_foot, self.th_foot])
-        self.th_kid_line.set_ydata([self.th_kid, self.th_kid])
-        self.th_jump_line.set_ydata([self.th_jump, self.th_jump])
+        state = (self._drawn_rate, vis, self.th_struct, self.th_foot, self.th_kid, self.th_jump)
+        if state != self._static_state or self._bg_hp is None:
+            self._static_state = state
+
+            # Threshold lines
+            for line in (self.th_struct_line, self.th_foot_line, self.th_kid_line, self.th_jump_line):
+                line.set_visible(vis)
+            self.th_struct_line.set_ydata([self.th_struct, self.th_struct])
+            self.th_foot_line.set_ydata([self.th_foot, self.th_foot])
+            self.th_kid_line.set_ydata([self.th_kid, self.th_kid])
+            self.th_jump_line.set_ydata([self.th_jump, self.th_jump])
+
+            self._bg_hp = None  # stale until the draw_event handler re-caches it
+            self.canvas.draw_idle()
+            return
 
-        self.canvas.draw_idle()
+        self.canvas.restore_region(self._bg_hp)
+        self.canvas.restore_region(self._bg_rms)
+        self.ax_hp.draw_artist(self.hp_line)
+        self.ax_rms.draw_artist(self.rms_line)
+        self.canvas.blit(self.ax_hp.bbox)
+        self.canvas.blit(self.ax_rms.bbox)
 
     # ---------- Debug helpers ----------
     def _refresh_debug_table(self):
-        self.tbl.delete(*self.tbl.get_children())
-        for row in list(self.debug_rows)[-DEBUG_ROWS:]:
-            self.tbl.insert("", "end", values=row)
-        if self.tbl.get_children():
-            self.tbl.see(self.tbl.get_children()[-1])
-
-    def _refresh_json_viewer(self, raw_json):
-        if not raw_json:
+        # Insert only rows that arrived since the last refresh, then trim the oldest
+        if not self._pending_tbl_rows:
             return
-        try:
-            obj = json.loads(raw_json)
-            pretty = json.dumps(obj, indent=2)
-        except Exception:
-            pretty = raw_json
+        for frame, latency_ms in self._pending_tbl_rows:
+            smp = frame.sample
+            sec = int(frame.recv_ts)
+            if sec != self._last_sec:
+                self._last_sec_str = time.strftime("%H:%M:%S", time.localtime(sec))
+                self._last_sec = sec
+            lt = f"{self._last_sec_str}.{int((frame.recv_ts - sec)*1000):03d}"
+            row = (lt, smp.ms, frame.qos, f"{latency_ms:.1f}", smp.label, f"{smp.rms:.3f}", f"{smp.hp_abs:.3f}", frame.topic)
+            self._tbl_iids.append(self.tbl.insert("", "end", values=row))
+        self._pending_tbl_rows.clear()
+        overflow = len(self._tbl_iids) - DEBUG_ROWS
+        if overflow > 0:
+            self.tbl.delete(*[self._tbl_iids.popleft() for _ in range(overflow)])
+        self.tbl.see(self._tbl_iids[-1])
+
+    def _refresh_json_viewer(self, frame):
+        # Shown as received (device JSON is already compact), at most 5 times a second
+        if frame is None or frame is self._last_displayed_frame:
+            return
+        now = time.monotonic()
+        wait = 0.2 - (now - self._json_last)
+        if wait > 0:
+            # Throttled: catch up once the window ends, or the stream's last frame is never shown
+            if not self._json_catchup:
+                self._json_catchup = True
+                self.after(int(wait * 1000) + 1, self._json_catch_up)
+            return
+        self._json_last = now
+        self._last_displayed_frame = frame
+        raw_json = frame.raw_json
+        if raw_json is None:
+            # Binary or simulated frame: render the parsed sample instead
+            smp = frame.sample
+            raw_json = json.dumps({"ms": smp.ms, "ax": smp.ax, "ay": smp.ay, "az": smp.az, "mag": smp.mag,
+                                   "hp_abs": smp.hp_abs, "rms": smp.rms, "label": smp.label})
+        elif isinstance(raw_json, bytes):
+            raw_json = raw_json.decode("utf-8", errors="ignore")
         self.json_text.delete("1.0", "end")
-        self.json_text.insert("1.0", pretty)
+        self.json_text.insert("1.0", raw_json)
+
+    def _json_catch_up(self):
+        self._json_catchup = False
+        self._refresh_json_viewer(self._last_frame)
 
     def _refresh_stats(self, last_latency_ms):
         if last_latency_ms is not None:
             self.lbl_cur_lat.config(text=f"Current latency: {last_latency_ms:.1f} ms")
-        if len(self.lat_samples) >= 2:
-            lat_list = list(self.lat_samples)
-            self.lbl_avg_lat.config(text=f"Avg: {statistics.fmean(lat_list):.1f} ms")
-            self.lbl_min_lat.config(text=f"Min: {min(lat_list):.1f} ms")
-            self.lbl_max_lat.config(text=f"Max: {max(lat_list):.1f} ms")
+        lat = self.lat_stats
+        if len(lat) >= 2:
+            self.lbl_avg_lat.config(text=f"Avg: {lat.mean():.1f} ms")
+            self.lbl_min_lat.config(text=f"Min: {lat.min():.1f} ms")
+            self.lbl_max_lat.config(text=f"Max: {lat.max():.1f} ms")
         else:
             self.lbl_avg_lat.config(text="Avg: — ms")
             self.lbl_min_lat.config(text="Min: — ms")
             self.lbl_max_lat.config(text="Max: — ms")
 
-        if len(self.arrival_ts) >= 3:
-            diffs = [self.arrival_ts[i]-self.arrival_ts[i-1] for i in range(1, len(self.arrival_ts))]
-            mean_dt = statistics.fmean(diffs)
+        n = len(self.arrival_ts)
+        if n >= 3:
+            # Mean of consecutive differences telescopes to (last - first) / (n - 1)
+            mean_dt = (self.arrival_ts[-1] - self.arrival_ts[0]) / (n - 1)
             rate = 1.0 / mean_dt if mean_dt > 0 else 0.0
             self.lbl_rate.config(text=f"Rate: {rate:.1f} msgs/s")
         else:
@@ -722,7 +1043,7 @@ class App(tk.Tk):
 
     def calib_clear(self):
         for k in self.calib.keys():
-            self.calib[k].clear()
+            del self.calib[k][:]
         self._update_calib_counts()
         self._toast("Calibration buffers cleared.")
 
@@ -730,15 +1051,18 @@ class App(tk.Tk):
         txt = "Samples — " + "  ".join([f"{k}:{len(v)}" for k,v in self.calib.items()])
         self.calib_counts_lbl.config(text=txt)
 
+    def _fmt_thresholds(self):
+        return (f"STRUCT ≥ {self.th_struct:.3f}\nFOOT   ≥ {self.th_foot:.3f}\n"
+                f"PLAY   ≥ {self.th_kid:.3f}\nJUMP   ≥ {self.th_jump:.3f}")
+
     def compute_thresholds_clicked(self):
         ok, a,b,c,d, msg = compute_thresholds(self.calib)
         if not ok:
             messagebox.showwarning("Calibration", msg); return
         self.th_struct, self.th_foot, self.th_kid, self.th_jump = a,b,c,d
         self.btn_save_th.config(state="normal")
-        self.redraw_all()
-        messagebox.showinfo("Calibration",
-            f"New thresholds (g):\nSTRUCT ≥ {a:.3f}\nFOOT   ≥ {b:.3f}\nPLAY   ≥ {c:.3f}\nJUMP   ≥ {d:.3f}")
+        self._request_redraw()
+        messagebox.showinfo("Calibration", "New thresholds (g):\n" + self._fmt_thresholds())
 
     def save_thresholds(self):
         path = filedialog.asksaveasfilename(title="Save Thresholds", defaultextension=".txt",
@@ -746,11 +1070,8 @@ class App(tk.Tk):
         if not path: return
         try:
             with open(path, "w", encoding="utf-8") as f:
-                f.write("# thresholds (g)\n")
-                f.write(f"TH_STRUCT={self.th_struct:.6f}\n")
-                f.write(f"TH_FOOT={self.th_foot:.6f}\n")
-                f.write(f"TH_KID={self.th_kid:.6f}\n")
-                f.write(f"TH_JUMP={self.th_jump:.6f}\n")
+                f.write("# thresholds (g)\n" + "".join(
+                    f"{k}={getattr(self, attr):.6f}\n" for k, attr in THRESHOLD_KEYS.items()))
             self._toast(f"Saved: {path}")
         except Exception as e:
             self._toast(f"Save failed: {e}")
@@ -760,21 +1081,20 @@ class App(tk.Tk):
         if not path: return
         try:
             with open(path, "r", encoding="utf-8") as f:
-                for ln in f:
-                    ln = ln.strip()
-                    if not ln or ln.startswith("#"): continue
-                    if "=" not in ln: continue
-                    k,v = ln.split("=",1)
-                    try: d = float(v.strip())
-                    except: continue
-                    k = k.strip().upper()
-                    if   k == "TH_STRUCT": self.th_struct = d
-                    elif k == "TH_FOOT":   self.th_foot   = d
-                    elif k == "TH_KID":    self.th_kid    = d
-                    elif k == "TH_JUMP":   self.th_jump   = d
-            self.redraw_all()
-            messagebox.showinfo("Calibration",
-                f"Loaded (g):\nSTRUCT ≥ {self.th_struct:.3f}\nFOOT   ≥ {self.th_foot:.3f}\nPLAY   ≥ {self.th_kid:.3f}\nJUMP   ≥ {self.th_jump:.3f}")
+                lines = f.read().splitlines()
+            # Parse everything first so a bad value leaves the thresholds untouched
+            new = {}
+            for ln in lines:
+                ln = ln.strip()
+                if not ln or ln[0] == "#" or "=" not in ln: continue
+                k, v = ln.split("=", 1)
+                attr = THRESHOLD_KEYS.get(k.strip().upper())
+                if attr:
+                    new[attr] = float(v)
+            for attr, d in new.items():
+                setattr(self, attr, d)
+            self._request_redraw()
+            messagebox.showinfo("Calibration", "Loaded (g):\n" + self._fmt_thresholds())
         except Exception as e:
             self._toast(f"Load failed: {e}")
 
@@ -783,12 +1103,12 @@ class App(tk.Tk):
                                             filetypes=[("CSV files","*.csv"),("All files","*.*")])
         if not path: return
         try:
-            with open(path, "w", encoding="utf-8", newline="") as f:
-                w = csv.writer(f)
+            with open(path, "w", encoding="utf-8", newline="", buffering=1 << 20) as f:
                 f.write("#CALIB rms,label\n")
-                for lbl, lst in self.calib.items():
-                    for v in lst:
-                        w.writerow([f"{v:.6f}", lbl])
+                # One savetxt per class; the label is a literal in the row format
+                for lbl, arr in self.calib.items():
+                    if len(arr):
+                        np.savetxt(f, np.frombuffer(arr, dtype=np.float64), fmt=f"%.6f,{lbl}", newline="\r\n")
             self._toast(f"Exported: {path}")
         except Exception as e:
             self._toast(f"Export failed: {e}")
@@ -797,22 +1117,31 @@ class App(tk.Tk):
         path = filedialog.askopenfilename(title="Import Calibration CSV", filetypes=[("CSV files","*.csv"),("All files","*.*")])
         if not path: return
         try:
-            added = 0
-            with open(path, "r", encoding="utf-8") as f:
-                for ln in f:
-                    ln = ln.strip()
-                    if not ln or ln.startswith("#"): continue
-                    parts = [x.strip() for x in ln.split(',')]
-                    if len(parts) >= 2:
-                        try:
-                            rms = float(parts[0]); lbl = parts[1].upper()
-                            if lbl in self.calib:
-                                self.calib[lbl].append(rms); added += 1
-                        except: pass
-                    elif len(parts) == 1:
+            # rows are "rms,label"; rows without a label go to the active class
+            if pd is not None:
+                try:
+                    df = pd.read_csv(path, header=None, comment="#", names=["rms", "lbl"], index_col=False,
+                                     dtype=str, skipinitialspace=True)
+                except pd.errors.EmptyDataError:
+                    df = pd.DataFrame({"rms": [], "lbl": []}, dtype=str)
+                rms = pd.to_numeric(df["rms"], errors="coerce").to_numpy(np.float64)
+                lbl = df["lbl"].str.strip().str.upper().fillna(self.calib_active_label).to_numpy(str)
+            else:
+                rms_l, lbl_l = [], []
+                with open(path, encoding="utf-8") as f:
+                    for ln in f:
+                        parts = [x.strip() for x in ln.split("#", 1)[0].split(",")]
                         try:
-                            rms = float(parts[0]); self.calib[self.calib_active_label].append(rms); added += 1
-                        except: pass
+                            rms_l.append(float(parts[0]))
+                        except ValueError:
+                            continue
+                        lbl_l.append(parts[1].upper() if len(parts) > 1 and parts[1] else self.calib_active_label)
+                rms, lbl = np.array(rms_l, dtype=np.float64), np.array(lbl_l, dtype=str)
+            added = 0
+            for k in LABELS:
+                sel = rms[(lbl == k) & np.isfinite(rms)]
+                self.calib[k].frombytes(sel.tobytes())
+                added += sel.size
             self._update_calib_counts()
             self.btn_compute.config(state="normal")
             self._toast(f"Imported {added} samples")
@@ -823,75 +1152,89 @@ class App(tk.Tk):
         """Append RMS from data CSV (column 7) into current calibration class."""
         path = filedialog.askopenfilename(title="Append From Data CSV", filetypes=[("CSV files","*.csv"),("All files","*.*")])
         if not path: return
+        # Parse on a worker so multi-GB files don't freeze Tk; chunks are
+        # handed back through _calib_import_q and appended in _drain_pump
+        self.btn_append_cal.config(state="disabled")
+        self._toast(f"Appending from {os.path.basename(path)}…")
+        threading.Thread(target=self._append_worker, args=(path, self.calib_active_label), daemon=True).start()
+
+    def _append_worker(self, path, label):
+        added = 0
         try:
-            added = 0
-            with open(path, "r", encoding="utf-8") as f:
-                for ln in f:
-                    ln = ln.strip()
-                    if not ln or ln.startswith("#"): continue
-                    parts = [x.strip() for x in ln.split(',')]
-                    if len(parts) >= 7:
-                        try:
-                            rms = float(parts[6])
-                            self.calib[self.calib_active_label].append(rms)
-                            added += 1
-                        except:
-                            pass
+            if pd is not None:
+                # str + coerce so one junk cell or short row drops that row, not the whole append
+                try:
+                    chunks = pd.read_csv(path, header=None, comment="#", usecols=[6], dtype=str,
+                                         on_bad_lines="skip", chunksize=100_000)
+                except pd.errors.EmptyDataError:
+                    chunks = ()
+                for chunk in chunks:
+                    rms = pd.to_numeric(chunk.iloc[:, 0], errors="coerce").dropna().to_numpy(np.float64)
+                    self._calib_import_q.append((label, rms))
+                    added += rms.size
+            else:
+                for rms in scan_csv_column(path, 6):
+                    self._calib_import_q.append((label, rms))
+                    added += len(rms)
+            msg = f"Appended {added} RMS samples → {label}"
+        except Exception as e:
+            msg = f"Append failed after {added} samples: {e}"
+        self._calib_import_q.append((None, msg))
+
+    def _drain_calib_imports(self):
+        while self._calib_import_q:
+            label, data = self._calib_import_q.popleft()
+            if label is not None:
+                self.calib[label].frombytes(data.tobytes())
+                continue
             self._update_calib_counts()
             self.btn_compute.config(state="normal")
-            self._toast(f"Appended {added} RMS samples → {self.calib_active_label}")
-        except Exception as e:
-            self._toast(f"Append failed: {e}")
+            self.btn_append_cal.config(state="normal")
+            self._toast(data)
 
     # ---------- Status / helpers ----------
     def _set_chip(self, rgb_255_tuple):
         r,g,b = rgb_255_tuple
-        self.status_chip.delete("all")
-        self.status_chip.create_rectangle(0,0,20,20, fill=f"#{r:02x}{g:02x}{b:02x}", width=0)
-
-    def _set_chip_rgb(self, rgb01):
-        r,g,b = [int(255*x) for x in rgb01]
-        self._set_chip((r,g,b))
+        self._last_status = None   # status text is being set by someone else
+        self.status_chip.itemconfig(self._chip_rect, fill=f"#{r:02x}{g:02x}{b:02x}")
 
     def _update_status(self, label):
-        up = (label or "").upper()
+        if label == self._last_status:
+            return
+        self._last_status = label
         self.status_lbl.config(text=label)
-        if up == "JUMP": self._set_chip_rgb(CLR_BAD)
-        elif up == "PLAY": self._set_chip_rgb(CLR_PLAY)
-        elif up == "FOOT": self._set_chip_rgb(CLR_WARN)
-        elif up == "STRUCT": self._set_chip_rgb(CLR_STRUCT)
-        else: self._set_chip_rgb(CLR_CALM)
+        self.status_chip.itemconfig(self._chip_rect, fill=COLOR_TABLE.get((label or "").upper(), CHIP_CALM))
 
     def _toast(self, msg):
         try:
+            self._last_status = None
             self.status_lbl.config(text=msg)
         except:
             pass
 
     # ---------- Synthetic CSV ----------
-    def _generate_synthetic_csv(self, seconds: int, rate_hz: float) -> List[str]:
+    def _generate_synthetic_rows(self, seconds: int, rate_hz: float) -> np.ndarray:
+        """Synthetic IMU trace as a SIM_DTYPE array (values rounded like the CSV log)."""
         total = max(1, int(seconds * rate_hz))
-        lines = []
-        rnd = random.Random(1)
+        rng = np.random.default_rng(1)
         win = 25
-        q = deque(maxlen=win)
-        sumsq = 0.0
-        for i in range(1, total+1):
-            t = i / rate_hz
-            burst = math.sin(2*math.pi*1.2*t) * (0.05 + 0.05*rnd.random())
-            transient = 0.15 if (i % 777 == 0) else 0.0
-            noise = (rnd.random() - 0.5) * 0.01
-            hp = abs(burst + transient) + abs(noise)
-            hp = clamp(hp, 0.0, 0.6)
-            if len(q) == win:
-                old = q[0]; sumsq -= old*old
-            q.append(hp); sumsq += hp*hp
-            rms = math.sqrt(sumsq / len(q))
-            label = compute_label_from_rms_custom(rms, self.th_struct, self.th_foot, self.th_kid, self.th_jump)
-            ax = noise; ay=noise; az=1.0+noise; mag = math.sqrt(ax*ax+ay*ay+az*az)
-            ms = int(round(i * (1000.0 / rate_hz)))
-            lines.append(f"{ms},{ax:.4f},{ay:.4f},{az:.4f},{mag:.4f},{hp:.4f},{rms:.4f},{label}")
-        return lines
+        i = np.arange(1, total+1)
+        t = i / rate_hz
+        burst = np.sin(2*np.pi*1.2*t) * (0.05 + 0.05*rng.random(total))
+        transient = np.where(i % 777 == 0, 0.15, 0.0)
+        noise = (rng.random(total) - 0.5) * 0.01
+        hp = np.clip(np.abs(burst + transient) + np.abs(noise), 0.0, 0.6)
+        rms = _rolling_rms(hp, win)
+        label = np.select([rms >= self.th_jump, rms >= self.th_kid, rms >= self.th_foot, rms >= self.th_struct],
+                          ["JUMP", "PLAY", "FOOT", "STRUCT"], default="CALM")
+        ax = noise; ay = noise; az = 1.0 + noise
+        mag = np.sqrt(ax*ax + ay*ay + az*az)
+        rows = np.empty(total, dtype=SIM_DTYPE)
+        rows["ms"] = np.round(i * (1000.0 / rate_hz))
+        for name, col in (("ax", ax), ("ay", ay), ("az", az), ("mag", mag), ("hp_abs", hp), ("rms", rms)):
+            rows[name] = np.round(col, 4)
+        rows["label"] = label
+        return rows
 
 # -------------- main --------------
 def main():
@@ -16,10 +16,14 @@ Dependencies:
   pip install paho-mqtt pandas matplotlib
 """
 
+import io
 import os
 import sys
 import time
+import base64
+import codecs
 import queue
+import selectors
 import threading
 import subprocess
 import tkinter as tk
@@ -29,19 +33,30 @@ import pandas as pd
 import numpy as np  # NEW
 
 import matplotlib
-matplotlib.use("TkAgg")
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.figure import Figure
 
 
 APP_TITLE = "MQTT QoS Analyzer — Integrated GUI"
 DEFAULT_CSV = "mqtt_qos_log.csv"
+# Numeric log columns, parsed straight to float64 by the C reader (float keeps NaN for gaps)
+NUMERIC_DTYPES = {c: "float64" for c in (
+    "qos", "msg_id", "pub_ts", "recv_ts", "delay_s", "delay_ms", "declared_size_bytes", "wire_size_bytes")}
+REQUIRED_COLS = [
+    "run_id","qos","msg_id","topic_name","msg_context","pub_ts","recv_ts",
+    "delay_s","delay_ms","declared_size_bytes","wire_size_bytes","pub_device","sub_device"
+]
+CONSOLE_MAX_LINES = 5000   # live log keeps only the newest lines
+CHUNK_ROWS = 500_000       # rows per read_csv chunk: peak memory stays flat as logs grow
+SUB_READY_LINE = "[SUB] Connected. Subscribing"   # SubQoS prints this from on_connect
+SUB_READY_TIMEOUT = 10.0   # s to wait for it before starting the publisher anyway
 
 
 # ----------------------- robust stream readers -----------------------
 class _StreamReader(threading.Thread):
     """Reads a text stream line-by-line and pushes lines to a queue."""
-    def __init__(self, stream, q: queue.Queue, tag: str, kind: str):
+    def __init__(self, stream, q: queue.SimpleQueue, tag: str, kind: str):
         super().__init__(daemon=True)
         self.stream = stream
         self.q = q
@@ -58,6 +73,155 @@ class _StreamReader(threading.Thread):
             self.q.put((self.tag, "ERR", f"[reader] {self.kind} error: {e}\n"))
 
 
+# --------------------------- log aggregation ---------------------------
+def _chunk_partials(chunk: pd.DataFrame, runid: str):
+    """Mergeable per-(run match, QoS) partials of one chunk, plus copies per msg_id."""
+    chunk = chunk.assign(_run=chunk["run_id"] == runid)
+    part = chunk.groupby(["_run", "qos"]).agg(
+        n=("msg_id", "size"),
+        lat_n=("delay_ms", "count"), lat_mean=("delay_ms", "mean"), lat_var=("delay_ms", "var"),
+        t_min=("recv_ts", "min"), t_max=("recv_ts", "max"),
+        size_sum=("wire_size_bytes", "sum"), size_n=("wire_size_bytes", "count"))
+    ids = chunk.groupby(["_run", "qos"])["msg_id"].value_counts(sort=False)
+    return part, ids
+
+
+def aggregate_qos_log(path: str, runid: str):
+    """
+    Per-QoS statistics of a QoS log, read in CHUNK_ROWS chunks.
+    Rows of `runid` are used; if there are none, all rows are.
+    Returns (agg indexed by QoS 0..2, total rows, rows matching runid).
+    """
+    for typed in (True, False):
+        parts, id_parts = [], []
+        total = matched = 0
+        try:
+            # run_id always as str: otherwise its type is guessed per chunk and a
+            # numeric-looking chunk would never match the (string) runid
+            dtype = {**NUMERIC_DTYPES, "run_id": str} if typed else {"run_id": str}
+            for chunk in pd.read_csv(path, chunksize=CHUNK_ROWS, dtype=dtype):
+                if not typed:
+                    # Non-numeric junk in a numeric column: coerce those columns
+                    for c in NUMERIC_DTYPES:
+                        chunk[c] = pd.to_numeric(chunk[c], errors="coerce")
+                part, ids = _chunk_partials(chunk, runid)
+                parts.append(part)
+                id_parts.append(ids)
+                total += len(chunk)
+                matched += int((chunk["run_id"] == runid).sum())
+            break
+        except ValueError:
+            if not typed:
+                raise
+
+    if not parts:
+        return None, 0, 0
+    part = pd.concat(parts)
+    ids = pd.concat(id_parts)
+    if matched:
+        part = part[part.index.get_level_values("_run")]
+        ids = ids[ids.index.get_level_values("_run")]
+
+    # Latency mean/std: combine chunk (count, mean, M2) with Chan's parallel update
+    by_qos = part.groupby(level="qos")
+    lat_n = by_qos["lat_n"].sum()
+    mean = (part["lat_mean"] * part["lat_n"]).fillna(0).groupby(level="qos").sum() / lat_n
+    dev = part["lat_mean"].to_numpy() - mean.reindex(part.index.get_level_values("qos")).to_numpy()
+    m2 = ((part["lat_var"] * (part["lat_n"] - 1)).fillna(0) + (part["lat_n"] * dev**2).fillna(0))
+    m2 = m2.groupby(level="qos").sum()
+
+    agg = pd.DataFrame({
+        "n": by_qos["n"].sum(),
+        "mean_ms": mean,
+        "std_ms": np.sqrt(m2 / (lat_n - 1)).where(lat_n > 1),
+        "t_min": by_qos["t_min"].min(),
+        "t_max": by_qos["t_max"].max(),
+        "avg_size": by_qos["size_sum"].sum() / by_qos["size_n"].sum(),
+    })
+    # Unique ids, id range and duplicates (EXTRA copies beyond the first) from the merged counts
+    counts = ids.groupby(level=["qos", "msg_id"]).sum()
+    id_vals = pd.Series(counts.index.get_level_values("msg_id"), index=counts.index.get_level_values("qos"))
+    agg = agg.join(id_vals.groupby(level="qos").agg(["size", "min", "max"])
+                          .set_axis(["received", "min_id", "max_id"], axis=1))
+    agg["dupes"] = (counts - 1).groupby(level="qos").sum()
+    return agg.reindex([0, 1, 2]), total, matched
+
+
+# --------------------------- static plots ---------------------------
+class _AggPlot:
+    """Figure rendered off-screen with Agg and shown as a PhotoImage in a Label.
+
+    The QoS charts are static, so a bitmap is all Tk needs; the figure is
+    re-rendered to the label's size when the layout changes.
+    """
+    def __init__(self, master, figsize=(4.8, 3.4), dpi=100):
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        self.ax = self.fig.add_subplot(111)
+        self.fig.subplots_adjust(bottom=0.22)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.label = tk.Label(master, bd=0, highlightthickness=0)
+        self.label.bind("<Configure>", self._on_configure)
+        self._photo = None
+        self._size = None
+        self._idle_pending = False
+
+    def get_tk_widget(self):
+        return self.label
+
+    def _on_configure(self, event):
+        size = (event.width, event.height)
+        if size == self._size or min(size) < 50:
+            return
+        self._size = size
+        dpi = self.fig.get_dpi()
+        self.fig.set_size_inches(event.width / dpi, event.height / dpi)
+        self.draw_idle()
+
+    def draw_idle(self):
+        # Coalesce repeated requests (resize bursts, re-analysis) into one render
+        if not self._idle_pending:
+            self._idle_pending = True
+            self.label.after_idle(self.draw)
+
+    def draw(self):
+        self._idle_pending = False
+        buf = io.BytesIO()
+        self.canvas.print_png(buf)
+        self._photo = tk.PhotoImage(master=self.label, data=base64.b64encode(buf.getvalue()))
+        self.label.configure(image=self._photo)
+
+
+class _PipeReader(threading.Thread):
+    """Reads both pipes of a process in one thread (selector, POSIX) and queues whole lines."""
+    def __init__(self, proc, q: queue.SimpleQueue, tag: str):
+        super().__init__(daemon=True)
+        self.q = q
+        self.tag = tag
+        self.sel = selectors.DefaultSelector()
+        for stream, kind in ((proc.stdout, "OUT"), (proc.stderr, "ERR")):
+            if stream:
+                decoder = codecs.getincrementaldecoder("utf-8")("replace")
+                self.sel.register(stream.fileno(), selectors.EVENT_READ, (kind, decoder, [""]))
+
+    def run(self):
+        try:
+            while self.sel.get_map():
+                for key, _ in self.sel.select():
+                    kind, decoder, partial = key.data   # partial: [text after the last newline]
+                    chunk = os.read(key.fd, 4096)
+                    *lines, partial[0] = (partial[0] + decoder.decode(chunk, final=not chunk)).split("\n")
+                    for line in lines:
+                        self.q.put((self.tag, kind, line + "\n"))
+                    if not chunk:   # EOF
+                        if partial[0]:
+                            self.q.put((self.tag, kind, partial[0]))
+                        self.sel.unregister(key.fd)
+        except Exception as e:
+            self.q.put((self.tag, "ERR", f"[reader] pipe error: {e}\n"))
+        finally:
+            self.sel.close()
+
+
 # ------------------------------ app ---------------------------------
 class App(tk.Tk):
     def __init__(self):
@@ -68,7 +232,10 @@ class App(tk.Tk):
         # State
         self.sub_proc = None
         self.pub_proc = None
-        self.log_q = queue.Queue()
+        self.log_q = queue.SimpleQueue()
+        self._console_pending = []     # lines inserted with one Text.insert per tick
+        self._console_at_bottom = True
+        self._sub_ready = False
         self.df = None
         self.csv_path = os.path.abspath(DEFAULT_CSV)
 
@@ -146,7 +313,7 @@ class App(tk.Tk):
 
         # Console (child of mid)
         console_frame = ttk.LabelFrame(mid, text="Live Log")
-        self.console = tk.Text(console_frame, height=10, wrap="word")
+        self.console = tk.Text(console_frame, height=10, wrap="word", undo=False)
         self.console.pack(fill=tk.BOTH, expand=True)
         mid.add(console_frame, weight=1)
 
@@ -194,35 +361,25 @@ class App(tk.Tk):
         scroll_y.grid(row=0, column=1, sticky="ns", padx=(0,8), pady=(8,0))
         scroll_x.grid(row=1, column=0, sticky="ew", padx=8, pady=(0,8))
 
-        # --- Plot canvases (give extra bottom margin to avoid cropped x labels) ---
-        self.fig_latency = Figure(figsize=(4.8, 3.4), dpi=100)
-        self.ax_latency = self.fig_latency.add_subplot(111)
-        self.fig_latency.subplots_adjust(bottom=0.22)
-
-        self.cv_latency = FigureCanvasTkAgg(self.fig_latency, master=self.plots_frame)
+        # --- Plots: Agg bitmaps in labels (extra bottom margin avoids cropped x labels) ---
+        self.cv_latency = _AggPlot(self.plots_frame)
+        self.fig_latency, self.ax_latency = self.cv_latency.fig, self.cv_latency.ax
         self.cv_latency.get_tk_widget().grid(row=0, column=0, padx=8, pady=8, sticky="nsew")
 
-        self.fig_reliab = Figure(figsize=(4.8, 3.4), dpi=100)
-        self.ax_reliab = self.fig_reliab.add_subplot(111)
-        self.fig_reliab.subplots_adjust(bottom=0.22)
-
-        self.cv_reliab = FigureCanvasTkAgg(self.fig_reliab, master=self.plots_frame)
+        self.cv_reliab = _AggPlot(self.plots_frame)
+        self.fig_reliab, self.ax_reliab = self.cv_reliab.fig, self.cv_reliab.ax
         self.cv_reliab.get_tk_widget().grid(row=0, column=1, padx=8, pady=8, sticky="nsew")
 
-        self.fig_thru = Figure(figsize=(4.8, 3.4), dpi=100)
-        self.ax_thru = self.fig_thru.add_subplot(111)
-        self.fig_thru.subplots_adjust(bottom=0.22)
-
-        self.cv_thru = FigureCanvasTkAgg(self.fig_thru, master=self.plots_frame)
+        self.cv_thru = _AggPlot(self.plots_frame)
+        self.fig_thru, self.ax_thru = self.cv_thru.fig, self.cv_thru.ax
         self.cv_thru.get_tk_widget().grid(row=1, column=0, padx=8, pady=8, sticky="nsew")
 
-        self.fig_dupe = Figure(figsize=(4.8, 3.4), dpi=100)
-        self.ax_dupe = self.fig_dupe.add_subplot(111)
-        self.fig_dupe.subplots_adjust(bottom=0.22)
-
-        self.cv_dupe = FigureCanvasTkAgg(self.fig_dupe, master=self.plots_frame)
+        self.cv_dupe = _AggPlot(self.plots_frame)
+        self.fig_dupe, self.ax_dupe = self.cv_dupe.fig, self.cv_dupe.ax
         self.cv_dupe.get_tk_widget().grid(row=1, column=1, padx=8, pady=8, sticky="nsew")
 
+        self._init_plots()
+
         self.plots_frame.grid_columnconfigure(0, weight=1)
         self.plots_frame.grid_columnconfigure(1, weight=1)
         self.plots_frame.grid_rowconfigure(0, weight=1)
@@ -243,16 +400,31 @@ class App(tk.Tk):
             self.csv_var.set(path)
 
     def _append_console(self, tag, stream, text):
-        self.console.insert(tk.END, f"[{tag}:{stream}] {text}")
-        self.console.see(tk.END)
+        if not self._console_pending:
+            # Follow the tail only if the user hasn't scrolled up
+            self._console_at_bottom = self.console.yview()[1] > 0.98
+        self._console_pending.append(f"[{tag}:{stream}] {text}")
+
+    def _flush_console(self):
+        self.console.insert(tk.END, "".join(self._console_pending))
+        self._console_pending.clear()
+        n = int(self.console.index("end-1c").split(".")[0])
+        if n > CONSOLE_MAX_LINES:
+            self.console.delete("1.0", f"{n - CONSOLE_MAX_LINES}.0")
+        if self._console_at_bottom:
+            self.console.see(tk.END)
 
     def _poll_logs(self):
         try:
             while True:
                 tag, stream, text = self.log_q.get_nowait()
+                if tag == "SUB" and text.startswith(SUB_READY_LINE):
+                    self._sub_ready = True
                 self._append_console(tag, stream, text)
         except queue.Empty:
             pass
+        if self._console_pending:
+            self._flush_console()
         self.after(100, self._poll_logs)
 
     def _spawn(self, args, tag):
@@ -266,10 +438,15 @@ class App(tk.Tk):
             errors="replace",
             bufsize=1  # line-buffered
         )
-        if proc.stdout:
-            _StreamReader(proc.stdout, self.log_q, tag=tag, kind="OUT").start()
-        if proc.stderr:
-            _StreamReader(proc.stderr, self.log_q, tag=tag, kind="ERR").start()
+        if os.name == "posix":
+            # One selector thread for both pipes
+            _PipeReader(proc, self.log_q, tag=tag).start()
+        else:
+            # Windows can't select() on pipes: one blocking reader per stream
+            if proc.stdout:
+                _StreamReader(proc.stdout, self.log_q, tag=tag, kind="OUT").start()
+            if proc.stderr:
+                _StreamReader(proc.stderr, self.log_q, tag=tag, kind="ERR").start()
         return proc
 
     # ------------- actions -------------
@@ -292,15 +469,27 @@ class App(tk.Tk):
             "--subdev", self.subdev_var.get(),
         ]
         self._append_console("GUI", "INFO", "Starting Subscriber…\n")
+        self._sub_ready = False
         self.sub_proc = self._spawn(args, tag="SUB")
 
     def run_local_test(self):
         # Start subscriber first if not running
         if not (self.sub_proc and self.sub_proc.poll() is None):
             self.start_subscriber()
-            time.sleep(0.8)  # allow subscription to attach
+        # Then start publisher once the subscriber reports it is subscribing (Tk keeps running)
+        self._start_pub_when_ready(time.monotonic() + SUB_READY_TIMEOUT)
+
+    def _start_pub_when_ready(self, deadline):
+        if not (self.sub_proc and self.sub_proc.poll() is None):
+            self._append_console("GUI", "ERR", "Subscriber not running; publisher not started.\n")
+            return
+        if not self._sub_ready:
+            if time.monotonic() < deadline:
+                self.after(50, self._start_pub_when_ready, deadline)
+                return
+            self._append_console("GUI", "WARN",
+                f"Subscriber not connected after {SUB_READY_TIMEOUT:.0f} s; starting publisher anyway.\n")
 
-        # Then start publisher
         if self.pub_proc and self.pub_proc.poll() is None:
             messagebox.showinfo("Publisher", "Publisher already running.")
             return
@@ -349,85 +538,57 @@ class App(tk.Tk):
             self.csv_path = path
             self._append_console("GUI", "INFO", f"Loaded CSV path: {path}\n")
 
-    # ---------- helper to infer "sent per QoS" ----------
-    @staticmethod
-    def _infer_sent_per_qos(dfq: pd.DataFrame) -> int | None:
-        """
-        Infer how many messages were sent for this QoS from msg_id.
-        Tries:
-          - if ids look 0-based: max_id + 1
-          - otherwise: unique id count as a lower bound
-        Returns None if cannot infer.
-        """
-        if dfq.empty or "msg_id" not in dfq.columns:
-            return None
-        ids = pd.to_numeric(dfq["msg_id"], errors="coerce").dropna().astype(int)
-        if ids.empty:
-            return None
-        max_id = int(ids.max())
-        min_id = int(ids.min())
-        uniq   = int(ids.nunique())
-        candidates = []
-        if min_id == 0 and max_id >= 0:
-            candidates.append(max_id + 1)
-        candidates.append(uniq)
-        inferred = max(candidates) if candidates else None
-        return inferred if (inferred is not None and inferred >= 1) else None
-
     def analyze_csv(self):
         path = self.csv_var.get()
         if not os.path.exists(path):
             messagebox.showerror("Analyze", f"CSV not found:\n{path}")
             return
         try:
-            df = pd.read_csv(path)
+            header = pd.read_csv(path, nrows=0).columns
         except Exception as e:
             messagebox.showerror("Analyze", f"Could not read CSV:\n{e}")
             return
-
-        required = [
-            "run_id","qos","msg_id","topic_name","msg_context","pub_ts","recv_ts",
-            "delay_s","delay_ms","declared_size_bytes","wire_size_bytes","pub_device","sub_device"
-        ]
-        for col in required:
-            if col not in df.columns:
+        for col in REQUIRED_COLS:
+            if col not in header:
                 messagebox.showerror("Analyze", f"CSV missing column: {col}")
                 return
 
         # Filter by run_id; if no match, analyze all
         runid = self.runid_var.get()
-        dfr = df[df["run_id"] == runid].copy()
-        if dfr.empty:
+        try:
+            agg, total, matched = aggregate_qos_log(path, runid)
+        except Exception as e:
+            messagebox.showerror("Analyze", f"Could not read CSV:\n{e}")
+            return
+        if total and not matched:
             self._append_console("GUI", "WARN", f"No rows for run_id={runid}; analyzing all rows.\n")
-            dfr = df.copy()
-        if dfr.empty:
+        if not total:
             messagebox.showwarning("Analyze", "CSV has no rows to analyze.")
             return
 
-        # Convert numeric
-        for c in ("qos","msg_id","pub_ts","recv_ts","delay_s","delay_ms","declared_size_bytes","wire_size_bytes"):
-            dfr[c] = pd.to_numeric(dfr[c], errors="coerce")
-
         # GUI fallback for reliability denominator
         sent_per_qos_gui = max(1, int(self.per_var.get()))
 
-        # Duplicate counting: count EXTRA copies beyond the first
-        dupe_counts = dfr.groupby(["qos", "msg_id"]).size().reset_index(name="Count")
-        dupe_extra_by_qos = (
-            dupe_counts.assign(extra=lambda x: x["Count"].clip(lower=1) - 1)
-                       .groupby("qos")["extra"].sum()
-        )
-
         # Build summary rows per QoS
         summary = []
         plots = dict(latency_ms=[], qos=[], reliability=[], throughput=[], dup_rate=[], avg_size=[])
 
-        for qos in (0, 1, 2):
-            qos_i = int(qos)
-
-            dfq = dfr[dfr["qos"] == qos_i].copy()
+        agg[["received", "n", "dupes"]] = agg[["received", "n", "dupes"]].fillna(0).astype(int)
+        # throughput: received / duration (recv_ts range)
+        duration = agg["t_max"] - agg["t_min"]
+        agg["thr"] = (agg["received"] / duration).where((agg["n"] >= 2) & (duration > 0))
+        # Sent per QoS inferred from the msg_id stats already aggregated:
+        #   - ids look 0-based: max(max_id + 1, unique ids)
+        #   - otherwise: unique id count as a lower bound
+        # NaN when there are no valid ids (the GUI value is used instead)
+        min_id, max_id = np.trunc(agg["min_id"]), np.trunc(agg["max_id"])
+        inferred = agg["received"].where(~((min_id == 0) & (max_id >= 0)),
+                                         np.maximum(max_id + 1, agg["received"]))
+        agg["sent_inferred"] = inferred.where(agg["min_id"].notna() & (inferred >= 1))
+
+        for qos_i, row in zip((0, 1, 2), agg.itertuples(index=False)):
             # --- infer sent per QoS from msg_id (robustly) ---
-            inferred_sent = self._infer_sent_per_qos(dfq)
+            inferred_sent = None if pd.isna(row.sent_inferred) else int(row.sent_inferred)
             sent_used = inferred_sent if (inferred_sent is not None) else sent_per_qos_gui
             if inferred_sent is not None:
                 # warn if disagreement >5%
@@ -435,21 +596,14 @@ class App(tk.Tk):
                     self._append_console("GUI", "WARN",
                         f"QoS {qos_i}: inferred sent={inferred_sent} differs from GUI={sent_per_qos_gui}. Using inferred.\n")
 
-            received = int(dfq["msg_id"].nunique())
-            mean_ms = float(dfq["delay_ms"].mean() if not dfq.empty else float("nan"))
-            std_ms  = float(dfq["delay_ms"].std()  if not dfq.empty else float("nan"))
-
-            # throughput: received / duration (recv_ts range)
-            if len(dfq) >= 2:
-                duration = float(dfq["recv_ts"].max() - dfq["recv_ts"].min())
-                thr = (received / duration) if duration > 0 else float("nan")
-            else:
-                thr = float("nan")
-
+            received = int(row.received)
+            mean_ms = float(row.mean_ms)
+            std_ms = float(row.std_ms)
+            thr = float(row.thr)
             reliab = (received / max(1, sent_used)) * 100.0
-            dupes = int(dupe_extra_by_qos.get(qos_i, 0))
-            dup_rate = (dupes / len(dfq)) * 100.0 if len(dfq) > 0 else 0.0
-            avg_size = float(dfq["wire_size_bytes"].mean() if not dfq.empty else float("nan"))
+            dupes = int(row.dupes)
+            dup_rate = (dupes / row.n) * 100.0 if row.n > 0 else 0.0
+            avg_size = float(row.avg_size)
 
             summary.append((qos_i, sent_used, received, mean_ms, std_ms, reliab, thr, dupes, dup_rate, avg_size))
 
@@ -491,50 +645,66 @@ class App(tk.Tk):
         self._append_console("GUI", "INFO", "Analysis complete.\n")
 
     # ------------- plotting -------------
+    @staticmethod
+    def _setup_axes(ax, title, ylabel):
+        ax.set_title(title)
+        ax.set_xlabel("QoS")
+        ax.set_ylabel(ylabel)
+        ax.set_xticks([0, 1, 2])
+        ax.grid(True)
+        return ax
+
+    def _init_plots(self):
+        """Decorate the axes and create the artists once; _plot_* only update their data."""
+        self._plot_cache = {}
+        self._latency_bars = self._setup_axes(self.ax_latency, "Average Latency vs QoS",
+                                              "Mean Latency (ms)").bar([0, 1, 2], [0, 0, 0])
+        self._reliab_line, = self._setup_axes(self.ax_reliab, "Reliability vs QoS",
+                                              "Reliability (%)").plot([0, 1, 2], [0, 0, 0], marker="o")
+        self.ax_reliab.set_ylim(0, 105)
+        self._thru_bars = self._setup_axes(self.ax_thru, "Throughput vs QoS",
+                                           "Messages per second").bar([0, 1, 2], [0, 0, 0])
+        self._dupe_bars = self._setup_axes(self.ax_dupe, "Duplicate Rate vs QoS",
+                                           "Duplicate Rate (%)").bar([0, 1, 2], [0, 0, 0])
+
+    def _plot_changed(self, key, values):
+        # Repeat Analyze on unchanged data: keep the last bitmap, skip the render
+        values = tuple(values)
+        if self._plot_cache.get(key) == values:
+            return False
+        self._plot_cache[key] = values
+        return True
+
+    @staticmethod
+    def _set_bars(ax, bars, values):
+        for rect, h in zip(bars, values):
+            rect.set_height(h)
+        ax.relim()
+        ax.autoscale_view(scalex=False)
+
     def _plot_latency(self, qos, values):
-        self.ax_latency.clear()
-        self.ax_latency.bar(qos, values)
-        self.ax_latency.set_title("Average Latency vs QoS")
-        self.ax_latency.set_xlabel("QoS")
-        self.ax_latency.set_ylabel("Mean Latency (ms)")
-        self.ax_latency.set_xticks([0, 1, 2])
-        self.ax_latency.grid(True)
-        self.fig_latency.subplots_adjust(bottom=0.22)  # keep labels visible
-        self.cv_latency.draw()
+        if not self._plot_changed("latency", values):
+            return
+        self._set_bars(self.ax_latency, self._latency_bars, values)
+        self.cv_latency.draw_idle()
 
     def _plot_reliability(self, qos, values):
-        self.ax_reliab.clear()
-        self.ax_reliab.plot(qos, values, marker="o")
-        self.ax_reliab.set_title("Reliability vs QoS")
-        self.ax_reliab.set_xlabel("QoS")
-        self.ax_reliab.set_ylabel("Reliability (%)")
-        self.ax_reliab.set_xticks([0, 1, 2])
-        self.ax_reliab.set_ylim(0, 105)
-        self.ax_reliab.grid(True)
-        self.fig_reliab.subplots_adjust(bottom=0.22)
-        self.cv_reliab.draw()
+        if not self._plot_changed("reliab", values):
+            return
+        self._reliab_line.set_data(qos, values)
+        self.cv_reliab.draw_idle()
 
     def _plot_throughput(self, qos, values):
-        self.ax_thru.clear()
-        self.ax_thru.bar(qos, values)
-        self.ax_thru.set_title("Throughput vs QoS")
-        self.ax_thru.set_xlabel("QoS")
-        self.ax_thru.set_ylabel("Messages per second")
-        self.ax_thru.set_xticks([0, 1, 2])
-        self.ax_thru.grid(True)
-        self.fig_thru.subplots_adjust(bottom=0.22)
-        self.cv_thru.draw()
+        if not self._plot_changed("thru", values):
+            return
+        self._set_bars(self.ax_thru, self._thru_bars, values)
+        self.cv_thru.draw_idle()
 
     def _plot_dupe(self, qos, values):
-        self.ax_dupe.clear()
-        self.ax_dupe.bar(qos, values)
-        self.ax_dupe.set_title("Duplicate Rate vs QoS")
-        self.ax_dupe.set_xlabel("QoS")
-        self.ax_dupe.set_ylabel("Duplicate Rate (%)")
-        self.ax_dupe.set_xticks([0, 1, 2])
-        self.ax_dupe.grid(True)
-        self.fig_dupe.subplots_adjust(bottom=0.22)
-        self.cv_dupe.draw()
+        if not self._plot_changed("dupe", values):
+            return
+        self._set_bars(self.ax_dupe, self._dupe_bars, values)
+        self.cv_dupe.draw_idle()
 
 
 if __name__ == "__main__":
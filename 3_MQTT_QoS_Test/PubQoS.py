@@ -8,25 +8,48 @@ with JSON payload including size (`sz`) and context.
 Usage:
   python3 PubQoS.py --broker 192.168.1.10 --port 1883 --topic test/qos \
     --per 100 --interval 0.05 --runid runA --pubdev RaspberryPi5 \
-    --ctx "sensor=desk,temp=24.6,hum=47.2"
+    --ctx "sensor=desk,temp=24.6,hum=47.2" [--persistent --client-id PubQoS-Pi5]
 """
 
 import argparse
-import json
+import logging
 import time
 import sys
 from typing import Optional
 
 import paho.mqtt.client as mqtt
 
+# Payload encoding: orjson if available (compact bytes), stdlib json otherwise
+try:
+    import orjson
 
-def build_payload(rid: str, qos: int, seq_id: int, ctx: str, pub: str) -> bytes:
-    """Build a compact JSON payload and include its byte size `sz`."""
-    obj = {"rid": rid, "q": qos, "id": seq_id, "t": time.time(), "ctx": ctx, "pub": pub}
-    tmp = json.dumps(obj, separators=(",", ":")).encode("utf-8")
-    obj["sz"] = len(tmp)  # declared size (bytes of compact JSON)
-    payload_bytes = json.dumps(obj, separators=(",", ":")).encode("utf-8")
-    return payload_bytes
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+except ImportError:
+    import json
+
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+MAX_INFLIGHT = 100   # QoS 1/2 messages awaiting their ack at once (paho default: 20)
+
+
+def payload_builder(rid: str, qos: int, ctx: str, pub: str):
+    """
+    Return build(seq_id) -> compact JSON payload bytes including its byte size `sz`.
+    Only `id` and `t` change within a batch, so the rest is encoded once here.
+    """
+    head = b'%s,"id":' % _dumps({"rid": rid, "q": qos})[:-1]
+    tail = b",%s" % _dumps({"ctx": ctx, "pub": pub})[1:]
+
+    def build(seq_id: int) -> bytes:
+        # repr(float) is what json.dumps emits for "t"
+        body = b'%s%d,"t":%s%s' % (head, seq_id, repr(time.time()).encode(), tail)
+        # declared size (bytes of compact JSON without `sz`), appended as the last key
+        return b'%s,"sz":%d}' % (body[:-1], len(body))
+
+    return build
 
 
 def main():
@@ -39,33 +62,74 @@ def main():
     ap.add_argument("--runid", default="runA", help="Run ID")
     ap.add_argument("--pubdev", default="RaspberryPi5", help="Publisher device label")
     ap.add_argument("--ctx", default="", help="Message context template/text")
+    ap.add_argument("--client-id", default="", help="MQTT client id (default: PubQoS-<time>, or PubQoS-<pubdev> with --persistent)")
+    ap.add_argument("--persistent", action="store_true",
+                    help="Keep the broker session between runs (clean_session=False, stable client id)")
     args = ap.parse_args()
 
     # If no explicit context, make a compact default (keeps payloads consistent)
     if not args.ctx:
         args.ctx = "sensor=desk,temp=24.5,hum=47.0"
 
-    client = mqtt.Client(client_id=f"PubQoS-{int(time.time())}", clean_session=True)
-    client.enable_logger()  # logs to stderr (GUI will capture)
+    # A persistent session needs the same client id on every run
+    client_id = args.client_id or (f"PubQoS-{args.pubdev}" if args.persistent else f"PubQoS-{int(time.time())}")
+    client = mqtt.Client(client_id=client_id, clean_session=not args.persistent)
+    # Warnings/errors to stderr (GUI will capture); per-packet DEBUG records are dropped
+    logger = logging.getLogger("paho")
+    logger.setLevel(logging.WARNING)
+    client.enable_logger(logger)
     try:
         client.connect(args.broker, args.port, keepalive=30)
     except Exception as e:
         print(f"[ERROR] Cannot connect to MQTT broker {args.broker}:{args.port} -> {e}", file=sys.stderr)
         sys.exit(2)
 
+    client.max_inflight_messages_set(MAX_INFLIGHT)
     client.loop_start()
+    # Don't start the clock until CONNACK: otherwise the first messages carry the connect RTT
+    deadline = time.monotonic() + 10
+    while not client.is_connected() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    if not client.is_connected():
+        print(f"[ERROR] No CONNACK from MQTT broker {args.broker}:{args.port} within 10 s", file=sys.stderr)
+        client.loop_stop()
+        sys.exit(2)
     try:
         for qos in (0, 1, 2):
             print(f"[PUB] QoS={qos} starting batch ({args.per} msgs)...", flush=True)
+            # Fixed cadence: sleep to the next monotonic deadline, so publish time
+            # doesn't stretch the interval
+            build_payload = payload_builder(args.runid, qos, args.ctx, args.pubdev)
+            infos = []
+            next_t = time.monotonic()
             for i in range(args.per):
-                payload = build_payload(args.runid, qos, i, args.ctx, args.pubdev)
-                info = client.publish(args.topic, payload=payload, qos=qos)
-                # Optional: wait for mid completion on qos>0
-                if qos > 0:
-                    info.wait_for_publish(timeout=10)
+                payload = build_payload(i)
+                # No per-message wait: QoS 1/2 handshakes overlap up to MAX_INFLIGHT
+                infos.append(client.publish(args.topic, payload=payload, qos=qos))
                 if i % 10 == 0:
                     print(f"[PUB] QoS={qos} sent {i+1}/{args.per}", flush=True)
-                time.sleep(args.interval)
+                next_t += args.interval
+                dt = next_t - time.monotonic()
+                if dt > 0:
+                    time.sleep(dt)
+                elif dt < -args.interval:
+                    next_t = time.monotonic()  # fell behind: resync, no catch-up burst
+            # Batch barrier: every message of this QoS is out (acked for QoS 1/2), with one
+            # 30 s deadline for the whole batch; never-queued messages (rc != 0) are only counted
+            not_queued = 0
+            deadline = time.monotonic() + 30
+            for info in infos:
+                if info.rc != mqtt.MQTT_ERR_SUCCESS:
+                    not_queued += 1
+                    continue
+                try:
+                    info.wait_for_publish(timeout=max(0.0, deadline - time.monotonic()))
+                except (RuntimeError, ValueError):
+                    pass
+            not_acked = sum(1 for info in infos if info.rc == mqtt.MQTT_ERR_SUCCESS and not info.is_published())
+            if not_queued or not_acked:
+                print(f"[WARN] QoS={qos}: {not_queued} not queued, {not_acked} not acknowledged",
+                      file=sys.stderr, flush=True)
             print(f"[PUB] QoS={qos} batch complete.", flush=True)
 
         print("[PUB] All QoS batches complete.", flush=True)
@@ -14,15 +14,29 @@ Usage:
 """
 
 import argparse
+import logging
 import csv
-import json
 import os
+import re
 import sys
 import time
+import queue
+import signal
+import threading
 from typing import Optional
 
 import paho.mqtt.client as mqtt
 
+# Payload decoding: orjson if available (parses the raw payload bytes directly)
+try:
+    import orjson as _json
+    _FAST_JSON = True
+except ImportError:
+    import json as _json
+    _FAST_JSON = False
+
+WRITE_BATCH = 500     # max rows per writerows() call on the writer thread
+
 CSV_HEADER = [
     "run_id", "qos", "msg_id", "topic_name", "msg_context", "pub_ts", "recv_ts",
     "delay_s", "delay_ms", "declared_size_bytes", "wire_size_bytes",
@@ -30,6 +44,33 @@ CSV_HEADER = [
 ]
 
 
+# Exact shape PubQoS sends (compact JSON, fixed key order, no escapes): without
+# orjson, reading the fields straight from the bytes is ~2x cheaper than json.loads
+# (orjson itself beats the regex, so it is only used as the stdlib fallback)
+_PAYLOAD_RE = re.compile(
+    rb'\{"rid":"([^"\\]*)","q":(-?\d+),"id":(-?\d+),"t":(-?[0-9.eE+-]+),'
+    rb'"ctx":"([^"\\]*)","pub":"([^"\\]*)","sz":(\d+)\}')
+
+
+def parse_payload(raw: bytes, wire_size: int):
+    """Return (rid, q, msg_id, pub_ts, ctx, pub_dev, declared_size) from a payload."""
+    m = None if _FAST_JSON else _PAYLOAD_RE.fullmatch(raw)
+    if m:
+        rid, q, mid, t, ctx, pub, sz = m.groups()
+        return rid.decode("utf-8"), int(q), int(mid), float(t), ctx.decode("utf-8"), pub.decode("utf-8"), int(sz)
+    data = _json.loads(raw)
+    return (data.get("rid", ""), int(data.get("q", -1)), int(data.get("id", -1)),
+            float(data.get("t", 0.0)), str(data.get("ctx", "")), str(data.get("pub", "")),
+            int(data.get("sz", wire_size)))
+
+
+def format_row(rid, q, mid, topic, ctx, pub_ts, recv_ts, declared, wire_size, pub_dev, sub_dev):
+    """CSV row (CSV_HEADER order) from the raw values queued by on_message."""
+    delay_s = recv_ts - pub_ts
+    return (rid, q, mid, topic, ctx, "%.6f" % pub_ts, "%.6f" % recv_ts,
+            "%.6f" % delay_s, "%.3f" % (delay_s * 1000.0), declared, wire_size, pub_dev, sub_dev)
+
+
 def ensure_header(path: str):
     newfile = not os.path.exists(path)
     if newfile:
@@ -49,9 +90,42 @@ def main():
     args = ap.parse_args()
 
     ensure_header(args.out)
+    # on_message runs on Paho's network loop (which also sends the QoS 1/2 acks):
+    # it only queues rows; a writer thread batches them into one buffered file
+    rows = queue.SimpleQueue()
+
+    def csv_writer_loop():
+        with open(args.out, "a", newline="", buffering=1 << 16) as out_f:
+            writer = csv.writer(out_f)
+            done = False
+            while not done:
+                row = rows.get()
+                batch = []
+                while row is not None:
+                    batch.append(row)
+                    if len(batch) >= WRITE_BATCH:
+                        break
+                    try:
+                        row = rows.get_nowait()
+                    except queue.Empty:
+                        break
+                done = row is None
+                # Float formatting happens here, in batch, not on the network loop
+                writer.writerows([format_row(*r) for r in batch])
+                if done or rows.empty():
+                    out_f.flush()   # idle: make rows visible to the analyzer
+
+    writer_thread = threading.Thread(target=csv_writer_loop, name="csv-writer", daemon=True)
+    writer_thread.start()
+
+    # The GUI stops us with terminate(): exit through `finally` so the buffer is written
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
 
     client = mqtt.Client(client_id=f"SubQoS-{int(time.time())}", clean_session=True)
-    client.enable_logger()
+    # Warnings/errors only: QoS 2 acks would otherwise log several records per message
+    logger = logging.getLogger("paho")
+    logger.setLevel(logging.WARNING)
+    client.enable_logger(logger)
 
     def on_connect(cli, userdata, flags, rc, properties=None):
         if rc == 0:
@@ -65,33 +139,16 @@ def main():
         raw = msg.payload  # bytes
         wire_size = len(raw)
         try:
-            data = json.loads(raw.decode("utf-8"))
+            rid, q, mid, pub_ts, ctx, pub_dev, declared = parse_payload(raw, wire_size)
         except Exception as e:
             print(f"[WARN] Non-JSON payload (ignored): {e}", file=sys.stderr, flush=True)
             return
 
-        rid = data.get("rid", "")
-        q = int(data.get("q", -1))
-        mid = int(data.get("id", -1))
-        pub_ts = float(data.get("t", 0.0))
-        ctx = str(data.get("ctx", ""))
-        pub_dev = str(data.get("pub", ""))
-        declared = int(data.get("sz", wire_size))
-
-        delay_s = recv_ts - pub_ts
-        delay_ms = delay_s * 1000.0
-
-        row = [
-            rid, q, mid, msg.topic, ctx, f"{pub_ts:.6f}", f"{recv_ts:.6f}",
-            f"{delay_s:.6f}", f"{delay_ms:.3f}", declared, wire_size,
-            pub_dev, args.subdev
-        ]
-
-        with open(args.out, "a", newline="") as f:
-            csv.writer(f).writerow(row)
+        rows.put((rid, q, mid, msg.topic, ctx, pub_ts, recv_ts, declared, wire_size, pub_dev, args.subdev))
 
         # light progress printing
         if mid % 10 == 0:
+            delay_ms = (recv_ts - pub_ts) * 1000.0
             print(f"[SUB] QoS={q} received msg_id={mid} delay_ms={delay_ms:.1f} (declared/wire={declared}/{wire_size})",
                   flush=True)
 
@@ -106,6 +163,7 @@ def main():
         client.connect(args.broker, args.port, keepalive=30)
     except Exception as e:
         print(f"[ERROR] Cannot connect to MQTT broker {args.broker}:{args.port} -> {e}", file=sys.stderr)
+        rows.put(None)
         sys.exit(2)
 
     try:
@@ -115,6 +173,8 @@ def main():
         print("[SUB] Interrupted by user.", flush=True)
     finally:
         client.disconnect()
+        rows.put(None)   # writer drains what is queued, flushes and exits
+        writer_thread.join(timeout=5)
 
 
 if __name__ == "__main__":
@@ -17,6 +17,9 @@ const char* TOP_IMU       = "smarthome/imu";   // <-- NEW: IMU JSON stream
 
 /* Optional on-board LED (set to -1 if unused) */
 #define LED_PIN -1
+
+/* IMU payload format: 0 = JSON, 1 = packed 44-byte record (see ImuWire) */
+#define IMU_BINARY_WIRE 0
 /* ================================= */
 
 /* ------------ MQTT ------------ */
@@ -149,6 +152,14 @@ static float rmsPush(float sampleAbs) {
   return sqrtf(rmsSumSq / n);
 }
 
+/* Binary IMU record; must match IMU_WIRE ("<I6f16s") in MQTT_imu_tk_v1.py */
+struct __attribute__((packed)) ImuWire {
+  uint32_t ms;
+  float ax, ay, az, mag, hp_abs, rms;
+  char label[16];   // NUL-padded
+};
+static_assert(sizeof(ImuWire) == 44, "ImuWire must be 44 bytes");
+
 static const char* classifyLabel(float rms) {
   if      (rms >= TH_JUMP)   return "JUMP";
   else if (rms >= TH_KID)    return "PLAY";
@@ -297,6 +308,14 @@ void loop() {
         if (now - lastImuPublishMs >= PUBLISH_EVERY_MS) {
           lastImuPublishMs = now;
 
+#if IMU_BINARY_WIRE
+          ImuWire w;
+          memset(&w, 0, sizeof(w));
+          w.ms = now; w.ax = ax; w.ay = ay; w.az = az;
+          w.mag = mag; w.hp_abs = hp_abs; w.rms = rms;
+          strncpy(w.label, label, sizeof(w.label));
+          mqtt.publish(TOP_IMU, (const uint8_t*)&w, sizeof(w), /*retain*/ false);
+#else
           StaticJsonDocument<256> j;
           j["ms"]     = now;
           j["ax"]     = ax;
@@ -310,6 +329,7 @@ void loop() {
           char buf[256];
           size_t n = serializeJson(j, buf, sizeof(buf));
           mqtt.publish(TOP_IMU, (const uint8_t*)buf, n, /*retain*/ false); // QoS0 in PubSubClient
+#endif
         }
       }
     }